@@ -2,86 +2,76 @@
 advanced_example.py - Demonstrates more advanced LangChain usage with multiple LLMs
 """
 
-import os
+import re
+import asyncio
+import functools
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
-from langchain_groq import ChatGroq
 from langchain.prompts import ChatPromptTemplate
 from langchain.output_parsers import ResponseSchema, StructuredOutputParser
-from langchain.chains import SequentialChain, LLMChain
-from langchain.memory import ConversationBufferMemory
+from compare_llms import initialize_models
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Check for required API keys
-required_keys = {
-    "OpenAI": os.getenv("OPENAI_API_KEY"),
-    "Anthropic": os.getenv("ANTHROPIC_API_KEY"),
-    "Groq": os.getenv("GROQ_API_KEY")
-}
-
 # Initialize models based on available API keys
-models = {}
-if required_keys["OpenAI"]:
-    models["openai"] = ChatOpenAI(model="gpt-4o", temperature=0.7)
-if required_keys["Anthropic"]:
-    models["claude"] = ChatAnthropic(model="claude-3-opus-20240229", temperature=0.7)
-if required_keys["Groq"]:
-    models["groq"] = ChatGroq(model="llama3-70b-8192", temperature=0.7)
-
-def run_structured_output_example():
-    """Example of using structured output parsing with different LLMs."""
-    print("\n=== STRUCTURED OUTPUT PARSING EXAMPLE ===")
+models = initialize_models()
 
-    # Define the output schemas
-    movie_review_schema = ResponseSchema(
-        name="movie_review",
-        description="A brief review of the movie."
-    )
-    rating_schema = ResponseSchema(
-        name="rating",
-        description="A rating of the movie from 1-10."
-    )
-    key_moments_schema = ResponseSchema(
-        name="key_moments",
-        description="List of 3 key moments or scenes from the movie."
-    )
+# Define the output schemas for the structured output example
+movie_review_schema = ResponseSchema(
+    name="movie_review",
+    description="A brief review of the movie."
+)
+rating_schema = ResponseSchema(
+    name="rating",
+    description="A rating of the movie from 1-10."
+)
+key_moments_schema = ResponseSchema(
+    name="key_moments",
+    description="List of 3 key moments or scenes from the movie."
+)
 
-    # Create the output parser
-    output_parser = StructuredOutputParser.from_response_schemas(
-        [movie_review_schema, rating_schema, key_moments_schema]
-    )
+# The parser and its format instructions are fixed by the schemas, so build them once
+MOVIE_OUTPUT_PARSER = StructuredOutputParser.from_response_schemas(
+    [movie_review_schema, rating_schema, key_moments_schema]
+)
+MOVIE_FORMAT_INSTRUCTIONS = MOVIE_OUTPUT_PARSER.get_format_instructions()
 
-    # Create the prompt template
-    prompt_template = """
+MOVIE_PROMPT = ChatPromptTemplate.from_template("""
     You are a film critic. Please analyze the following movie:
     
     Movie: {movie_title}
     
     {format_instructions}
-    """
+    """)
 
-    # Create the prompt with format instructions
-    prompt = ChatPromptTemplate.from_template(
-        template=prompt_template
+@functools.lru_cache(maxsize=None)
+def format_movie_prompt(movie_title):
+    """Format the film critic prompt for a movie title, once per title."""
+    return MOVIE_PROMPT.format(
+        movie_title=movie_title,
+        format_instructions=MOVIE_FORMAT_INSTRUCTIONS
     )
+
+async def arun_structured_output_example(movie_title="Inception"):
+    """Example of using structured output parsing with different LLMs."""
+    print("\n=== STRUCTURED OUTPUT PARSING EXAMPLE ===")
+
+    formatted_prompt = format_movie_prompt(movie_title)
     
-    for model_name, model in models.items():
+    # Query every model at once so total latency is that of the slowest provider
+    messages = [{"role": "user", "content": formatted_prompt}]
+    responses = await asyncio.gather(
+        *(model.ainvoke(messages) for model in models.values()),
+        return_exceptions=True
+    )
+    
+    for model_name, response in zip(models.keys(), responses):
         try:
-            # Format the prompt with the output parser instructions
-            formatted_prompt = prompt.format(
-                movie_title="Inception",
-                format_instructions=output_parser.get_format_instructions()
-            )
-            
-            # Get the response
-            messages = [{"role": "user", "content": formatted_prompt}]
-            response = model.invoke(messages)
+            if isinstance(response, Exception):
+                raise response
             
             # Parse the response
-            parsed_response = output_parser.parse(response.content)
+            parsed_response = MOVIE_OUTPUT_PARSER.parse(response.content)
             
             print(f"\n--- {model_name.upper()} STRUCTURED RESPONSE ---")
             print(f"Review: {parsed_response['movie_review']}")
@@ -92,9 +82,28 @@ def run_structured_output_example():
             print(f"\n--- {model_name.upper()} ERROR ---")
             print(f"Error: {str(e)}")
 
+# Concept and story are requested in one round-trip and split on the delimiters
+CONCEPT_STORY_PROMPT = ChatPromptTemplate.from_template("""
+    Generate a short story concept about {topic}. 
+    The concept should include a main character and a central conflict.
+    
+    Then write a short story (about 3-4 paragraphs) that develops this concept.
+    
+    Output STRICTLY in this format:
+    <CONCEPT>
+    the story concept
+    </CONCEPT>
+    <STORY>
+    the full story
+    </STORY>
+    """)
+
+CONCEPT_RE = re.compile(r"<CONCEPT>(.*?)</CONCEPT>", re.DOTALL)
+STORY_RE = re.compile(r"<STORY>(.*?)</STORY>", re.DOTALL)
+
 def run_multi_chain_example():
-    """Example of using multiple chains with memory."""
-    print("\n=== MULTI-CHAIN WITH MEMORY EXAMPLE ===")
+    """Example of generating a story concept and the story built on it in a single call."""
+    print("\n=== CONCEPT AND STORY EXAMPLE ===")
     
     # Select the first available model
     if not models:
@@ -104,54 +113,18 @@ def run_multi_chain_example():
     model_name, model = next(iter(models.items()))
     print(f"Using {model_name} for this example")
     
-    # First chain: Generate a story concept
-    concept_template = """
-    Generate a short story concept about {topic}. 
-    The concept should include a main character and a central conflict.
-    """
-    concept_prompt = ChatPromptTemplate.from_template(concept_template)
-    concept_memory = ConversationBufferMemory(input_key="topic", memory_key="chat_history")
-    concept_chain = LLMChain(
-        llm=model,
-        prompt=concept_prompt,
-        output_key="concept",
-        memory=concept_memory,
-        verbose=True
-    )
-    
-    # Second chain: Expand the concept into a story
-    story_template = """
-    Based on the following concept:
-    
-    {concept}
-    
-    Write a short story (about 3-4 paragraphs) that develops this concept.
-    """
-    story_prompt = ChatPromptTemplate.from_template(story_template)
-    story_memory = ConversationBufferMemory(input_key="concept", memory_key="chat_history")
-    story_chain = LLMChain(
-        llm=model,
-        prompt=story_prompt,
-        output_key="story",
-        memory=story_memory,
-        verbose=True
-    )
-    
-    # Chain them together
-    sequential_chain = SequentialChain(
-        chains=[concept_chain, story_chain],
-        input_variables=["topic"],
-        output_variables=["concept", "story"],
-        verbose=True
-    )
+    # Run the combined prompt
+    formatted_prompt = CONCEPT_STORY_PROMPT.format(topic="a time traveler who accidentally changes history")
+    response = model.invoke([{"role": "user", "content": formatted_prompt}])
     
-    # Run the chain
-    result = sequential_chain.invoke({"topic": "a time traveler who accidentally changes history"})
+    # Split the response into its two sections, falling back to the raw text
+    concept_match = CONCEPT_RE.search(response.content)
+    story_match = STORY_RE.search(response.content)
     
     print("\n--- STORY CONCEPT ---")
-    print(result["concept"])
+    print(concept_match.group(1).strip() if concept_match else "(concept section missing)")
     print("\n--- FULL STORY ---")
-    print(result["story"])
+    print(story_match.group(1).strip() if story_match else response.content)
 
 def main():
     if not models:
@@ -161,7 +134,7 @@ def main():
     print(f"Found {len(models)} configured LLM(s): {', '.join(models.keys())}")
     
     # Run examples
-    run_structured_output_example()
+    asyncio.run(arun_structured_output_example())
     run_multi_chain_example()
 
 if __name__ == "__main__":
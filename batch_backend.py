@@ -0,0 +1,118 @@
+"""
+batch_backend.py - Submit prompts through provider Batch APIs for offline evaluation runs
+"""
+
+import os
+import json
+import time
+import tempfile
+
+# Seconds to wait between batch status checks
+POLL_INTERVAL = 30
+# Upper bound on completion tokens for Anthropic requests (required by the API)
+ANTHROPIC_MAX_TOKENS = 1024
+
+def submit_openai_batch(requests, model, temperature=0.7, system=None, client=None, poll_interval=POLL_INTERVAL, max_tokens=None, stop=None):
+    """Run {custom_id: prompt} through the OpenAI Batch API and return {custom_id: content}."""
+    from openai import OpenAI
+
+    client = client or OpenAI()
+
+    # An optional system message goes before every prompt
+    system_messages = [{"role": "system", "content": system}] if system else []
+    extra_body = {"max_tokens": max_tokens} if max_tokens else {}
+    if stop:
+        extra_body["stop"] = stop
+
+    # Write one chat completion request per line
+    with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False, encoding="utf-8") as f:
+        for custom_id, prompt in requests.items():
+            line = {
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": model,
+                    "temperature": temperature,
+                    "messages": system_messages + [{"role": "user", "content": prompt}],
+                    **extra_body
+                }
+            }
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        input_path = f.name
+
+    try:
+        with open(input_path, "rb") as f:
+            batch_file = client.files.create(file=f, purpose="batch")
+    finally:
+        os.remove(input_path)
+
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    print(f"Submitted OpenAI batch {batch.id} with {len(requests)} request(s)")
+
+    # Wait for the batch to finish
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        time.sleep(poll_interval)
+        batch = client.batches.retrieve(batch.id)
+        print(f"  OpenAI batch {batch.id}: {batch.status}")
+
+    results = {custom_id: f"Error: batch {batch.status}" for custom_id in requests}
+    if batch.status != "completed" or not batch.output_file_id:
+        return results
+
+    # Re-key the output lines by custom_id
+    output = client.files.content(batch.output_file_id).text
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        response = item.get("response") or {}
+        if item.get("error") or response.get("status_code") != 200:
+            results[item["custom_id"]] = f"Error: {item.get('error') or response.get('body')}"
+        else:
+            results[item["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+
+    return results
+
+def submit_anthropic_batch(requests, model, temperature=0.7, client=None, poll_interval=POLL_INTERVAL):
+    """Run {custom_id: prompt} through Anthropic Message Batches and return {custom_id: content}."""
+    from anthropic import Anthropic
+
+    client = client or Anthropic()
+
+    batch = client.messages.batches.create(
+        requests=[
+            {
+                "custom_id": custom_id,
+                "params": {
+                    "model": model,
+                    "max_tokens": ANTHROPIC_MAX_TOKENS,
+                    "temperature": temperature,
+                    "messages": [{"role": "user", "content": prompt}]
+                }
+            }
+            for custom_id, prompt in requests.items()
+        ]
+    )
+    print(f"Submitted Anthropic batch {batch.id} with {len(requests)} request(s)")
+
+    # Wait for the batch to finish
+    while batch.processing_status != "ended":
+        time.sleep(poll_interval)
+        batch = client.messages.batches.retrieve(batch.id)
+        print(f"  Anthropic batch {batch.id}: {batch.processing_status}")
+
+    results = {custom_id: "Error: missing from batch results" for custom_id in requests}
+    for entry in client.messages.batches.results(batch.id):
+        if entry.result.type == "succeeded":
+            results[entry.custom_id] = "".join(
+                block.text for block in entry.result.message.content if block.type == "text"
+            )
+        else:
+            results[entry.custom_id] = f"Error: batch request {entry.result.type}"
+
+    return results
@@ -3,47 +3,144 @@ compare_llms.py - Script to compare responses from different LLMs for the same p
 """
 
 import os
-import json
+import orjson
+import asyncio
+import argparse
+import importlib
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
-from langchain_groq import ChatGroq
-from langchain.prompts import ChatPromptTemplate
 from prompt_templates import get_template
+from batch_backend import submit_openai_batch, submit_anthropic_batch
+import llm_cache
+import http_pool
+import vllm_backend
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Providers that can be routed through a vendor Batch API
+BATCH_BACKENDS = {
+    "openai": submit_openai_batch,
+    "claude": submit_anthropic_batch
+}
+
+# In-flight model calls keyed by cache key, so concurrent duplicates share one request
+_pending = {}
+
+# Comparison examples: (title, template name, inputs, output file)
+EXAMPLES = [
+    ("SUMMARIZATION", "summarization", {
+        "content": """
+        Artificial intelligence (AI) is intelligence demonstrated by machines, as opposed to natural intelligence displayed by animals including humans. 
+        AI research has been defined as the field of study of intelligent agents, which refers to any system that perceives its environment and takes actions that maximize its chance of achieving its goals.
+        The term "artificial intelligence" had previously been used to describe machines that mimic and display "human" cognitive skills that are associated with the human mind, such as "learning" and "problem-solving". 
+        This definition has since been rejected by major AI researchers who now describe AI in terms of rationality and acting rationally, which does not limit how intelligence can be articulated.
+        AI applications include advanced web search engines, recommendation systems, understanding human speech, self-driving cars, automated decision-making, and competing at the highest level in strategic game systems.
+        As machines become increasingly capable, tasks considered to require "intelligence" are often removed from the definition of AI, a phenomenon known as the AI effect.
+        """,
+        "length": "2-3 sentences"
+    }, "summarization_results.json"),
+    ("CREATIVE WRITING", "creative_writing", {
+        "style": "short story",
+        "topic": "a world where dreams become reality",
+        "tone": "mysterious and thought-provoking",
+        "length": "3 paragraphs"
+    }, "creative_results.json"),
+    ("CODE GENERATION", "code_generation", {
+        "language": "Python",
+        "task": "Create a function that calculates the Fibonacci sequence up to n terms using memoization",
+        "requirements": "- Include type hints\n- Include docstring\n- Handle edge cases"
+    }, "code_results.json")
+]
+
+# Supported providers: (name, LangChain module, chat model class, model id, API key variable)
+PROVIDERS = [
+    ("openai", "langchain_openai", "ChatOpenAI", "gpt-4o", "OPENAI_API_KEY"),
+    ("claude", "langchain_anthropic", "ChatAnthropic", "claude-3-opus-20240229", "ANTHROPIC_API_KEY"),
+    ("groq", "langchain_groq", "ChatGroq", "llama3-70b-8192", "GROQ_API_KEY")
+]
+
+# Providers whose LangChain clients accept the shared httpx clients
+POOLED_PROVIDERS = {"openai", "groq"}
+
 # Initialize models based on available API keys
 def initialize_models():
     """Initialize LLM models from different providers."""
     models = {}
     
-    # Initialize OpenAI
-    if os.getenv("OPENAI_API_KEY"):
-        models["openai"] = ChatOpenAI(
-            model="gpt-4o",
-            temperature=0.7
-        )
+    for name, module_name, class_name, model_id, env_var in PROVIDERS:
+        if not os.getenv(env_var):
+            continue
+        
+        # Import the provider SDK only when its API key is configured
+        chat_model = getattr(importlib.import_module(module_name), class_name)
+        kwargs = http_pool.client_kwargs() if name in POOLED_PROVIDERS else {}
+        models[name] = chat_model(model=model_id, temperature=0.7, **kwargs)
     
-    # Initialize Claude
-    if os.getenv("ANTHROPIC_API_KEY"):
-        models["claude"] = ChatAnthropic(
-            model="claude-3-opus-20240229",
-            temperature=0.7
-        )
-    
-    # Initialize Groq
-    if os.getenv("GROQ_API_KEY"):
-        models["groq"] = ChatGroq(
-            model="llama3-70b-8192",
-            temperature=0.7
+    # A self-hosted vLLM server takes the Llama3-70B slot in place of Groq
+    if vllm_backend.VLLM_URL:
+        from langchain_openai import ChatOpenAI
+        models["groq"] = ChatOpenAI(
+            base_url=f"{vllm_backend.VLLM_URL}/v1",
+            api_key="EMPTY",
+            model=vllm_backend.VLLM_MODEL,
+            temperature=0.7,
+            **http_pool.client_kwargs()
         )
     
     return models
 
-def compare_responses(models, prompt_template, prompt_inputs, save_to_file=None):
-    """Run the same prompt on all available models and compare responses."""
+def get_bulk_backend(model_name, use_batch):
+    """Return the function that submits all prompts for a model at once, or None to invoke it live."""
+    if model_name == "groq" and vllm_backend.VLLM_URL:
+        return vllm_backend.batch_chat
+    if use_batch:
+        return BATCH_BACKENDS.get(model_name)
+    return None
+
+def get_model_id(model):
+    """Return the provider model id of a LangChain chat model."""
+    return getattr(model, "model_name", None) or model.model
+
+def save_results(save_to_file, prompt, results):
+    """Write a prompt and its per-model responses to a JSON file."""
+    output = {
+        "prompt": prompt,
+        "responses": results
+    }
+    with open(save_to_file, 'wb') as f:
+        f.write(orjson.dumps(output, option=orjson.OPT_INDENT_2))
+    print(f"\nResults saved to {save_to_file}")
+
+def append_jsonl(stream_to_file, model_name, prompt, content):
+    """Append one {model, prompt, response} record to a JSONL results log."""
+    with open(stream_to_file, 'ab') as f:
+        f.write(orjson.dumps({"model": model_name, "prompt": prompt, "response": content}) + b"\n")
+
+async def _ainvoke_and_store(model, prompt, key):
+    """Call the model and persist its response under the request's cache key."""
+    response = await model.ainvoke([{"role": "user", "content": prompt}])
+    llm_cache.set(key, response.content)
+    return response.content
+
+async def cached_ainvoke(model_name, model, prompt, use_cache=True):
+    """Invoke a model asynchronously, reusing a stored or in-flight response for an identical request."""
+    key = llm_cache.make_key(model_name, get_model_id(model), model.temperature, prompt)
+    if use_cache:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return cached
+    
+    # Identical requests already in flight share one API call; there is no await between
+    # the lookup and the insert, so no lock is needed on the event loop
+    task = _pending.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_ainvoke_and_store(model, prompt, key))
+        _pending[key] = task
+        task.add_done_callback(lambda _: _pending.pop(key, None))
+    return await task
+
+async def acompare_responses(models, prompt_template, prompt_inputs, save_to_file=None, use_cache=True, stream_to_file=None):
+    """Run the same prompt on all available models concurrently and compare responses."""
     # Format the prompt
     prompt = prompt_template.format(**prompt_inputs)
     
@@ -53,34 +150,111 @@ def compare_responses(models, prompt_template, prompt_inputs, save_to_file=None)
     print("\n=== PROMPT ===")
     print(prompt)
     
-    # Get responses from each model
-    for model_name, model in models.items():
-        try:
-            messages = [{"role": "user", "content": prompt}]
-            response = model.invoke(messages)
-            results[model_name] = response.content
+    async def invoke(model_name, model):
+        content = await cached_ainvoke(model_name, model, prompt, use_cache)
+        # Log each response as soon as it arrives rather than after the whole comparison
+        if stream_to_file:
+            append_jsonl(stream_to_file, model_name, prompt, content)
+        return content
+    
+    # Fire all model calls at once so total latency is that of the slowest provider
+    tasks = [invoke(model_name, model) for model_name, model in models.items()]
+    responses = await asyncio.gather(*tasks, return_exceptions=True)
+    
+    for model_name, response in zip(models.keys(), responses):
+        if isinstance(response, Exception):
+            results[model_name] = f"Error: {str(response)}"
+            print(f"\n=== {model_name.upper()} ERROR ===")
+            print(f"Error: {str(response)}")
+        else:
+            results[model_name] = response
             
             print(f"\n=== {model_name.upper()} RESPONSE ===")
-            print(response.content)
-            
-        except Exception as e:
-            results[model_name] = f"Error: {str(e)}"
-            print(f"\n=== {model_name.upper()} ERROR ===")
-            print(f"Error: {str(e)}")
+            print(response)
     
     # Save results to a file if requested
     if save_to_file:
-        with open(save_to_file, 'w') as f:
-            output = {
-                "prompt": prompt,
-                "responses": results
-            }
-            json.dump(output, f, indent=2)
-            print(f"\nResults saved to {save_to_file}")
+        save_results(save_to_file, prompt, results)
     
     return results
 
-def run_comparisons():
+def compare_responses(models, prompt_template, prompt_inputs, save_to_file=None, use_cache=True, stream_to_file=None):
+    """Run the same prompt on all available models and compare responses."""
+    return asyncio.run(acompare_responses(models, prompt_template, prompt_inputs, save_to_file, use_cache, stream_to_file))
+
+async def arun_live_models(models, prompts, use_cache=True):
+    """Invoke each model on every {custom_id: prompt} pair concurrently."""
+    keys = [(model_name, custom_id) for model_name in models for custom_id in prompts]
+    responses = await asyncio.gather(
+        *(cached_ainvoke(model_name, models[model_name], prompts[custom_id], use_cache) for model_name, custom_id in keys),
+        return_exceptions=True
+    )
+    
+    results = {model_name: {} for model_name in models}
+    for (model_name, custom_id), response in zip(keys, responses):
+        if isinstance(response, Exception):
+            results[model_name][custom_id] = f"Error: {str(response)}"
+        else:
+            results[model_name][custom_id] = response
+    
+    return results
+
+def run_batch_comparisons(models, use_cache=True, use_batch=True, stream_to_file=None):
+    """Submit every example for every model as one batch per provider and save the results."""
+    # Format all prompts up front, keyed by template name
+    prompts = {
+        template_name: get_template(template_name).format(**inputs)
+        for _, template_name, inputs, _ in EXAMPLES
+    }
+    
+    # Providers with a bulk backend (Batch API or vLLM) go through it; the rest are invoked live
+    results = {}
+    live_models = {}
+    for model_name, model in models.items():
+        backend = get_bulk_backend(model_name, use_batch)
+        if backend:
+            keys = {
+                custom_id: llm_cache.make_key(model_name, get_model_id(model), model.temperature, prompt)
+                for custom_id, prompt in prompts.items()
+            }
+            cached = {custom_id: llm_cache.get(key) for custom_id, key in keys.items()} if use_cache else {}
+            results[model_name] = {custom_id: content for custom_id, content in cached.items() if content is not None}
+            
+            # Only submit the prompts we don't already have answers for
+            pending = {custom_id: prompt for custom_id, prompt in prompts.items() if custom_id not in results[model_name]}
+            if pending:
+                fresh = backend(pending, get_model_id(model), model.temperature)
+                for custom_id, content in fresh.items():
+                    if not content.startswith("Error:"):
+                        llm_cache.set(keys[custom_id], content)
+                results[model_name].update(fresh)
+        else:
+            live_models[model_name] = model
+    if live_models:
+        results.update(asyncio.run(arun_live_models(live_models, prompts, use_cache)))
+    
+    for title, template_name, _, save_to_file in EXAMPLES:
+        print(f"\n\n=== {title} ===")
+        print("\n=== PROMPT ===")
+        print(prompts[template_name])
+        
+        responses = {model_name: results[model_name][template_name] for model_name in models}
+        for model_name, content in responses.items():
+            print(f"\n=== {model_name.upper()} RESPONSE ===")
+            print(content)
+            if stream_to_file and not content.startswith("Error:"):
+                append_jsonl(stream_to_file, model_name, prompts[template_name], content)
+        
+        save_results(save_to_file, prompts[template_name], responses)
+
+async def arun_examples(models, use_cache=True, stream_to_file=None):
+    """Run each comparison example in turn, with all models queried concurrently."""
+    for i, (title, template_name, inputs, save_to_file) in enumerate(EXAMPLES, start=1):
+        print(f"\n\n=== EXAMPLE {i}: {title} ===")
+        template = get_template(template_name)
+        await acompare_responses(models, template, inputs, save_to_file, use_cache, stream_to_file)
+
+def run_comparisons(use_batch=False, use_cache=True, stream_to_file=None):
     """Run various comparisons between different LLMs."""
     # Initialize models
     models = initialize_models()
@@ -91,42 +265,26 @@ def run_comparisons():
     
     print(f"Found {len(models)} configured LLM(s): {', '.join(models.keys())}")
     
-    # Example 1: Summarization
-    print("\n\n=== EXAMPLE 1: SUMMARIZATION ===")
-    summarization_template = get_template("summarization")
-    summarization_inputs = {
-        "content": """
-        Artificial intelligence (AI) is intelligence demonstrated by machines, as opposed to natural intelligence displayed by animals including humans. 
-        AI research has been defined as the field of study of intelligent agents, which refers to any system that perceives its environment and takes actions that maximize its chance of achieving its goals.
-        The term "artificial intelligence" had previously been used to describe machines that mimic and display "human" cognitive skills that are associated with the human mind, such as "learning" and "problem-solving". 
-        This definition has since been rejected by major AI researchers who now describe AI in terms of rationality and acting rationally, which does not limit how intelligence can be articulated.
-        AI applications include advanced web search engines, recommendation systems, understanding human speech, self-driving cars, automated decision-making, and competing at the highest level in strategic game systems.
-        As machines become increasingly capable, tasks considered to require "intelligence" are often removed from the definition of AI, a phenomenon known as the AI effect.
-        """,
-        "length": "2-3 sentences"
-    }
-    compare_responses(models, summarization_template, summarization_inputs, "summarization_results.json")
-    
-    # Example 2: Creative Writing
-    print("\n\n=== EXAMPLE 2: CREATIVE WRITING ===")
-    creative_template = get_template("creative_writing")
-    creative_inputs = {
-        "style": "short story",
-        "topic": "a world where dreams become reality",
-        "tone": "mysterious and thought-provoking",
-        "length": "3 paragraphs"
-    }
-    compare_responses(models, creative_template, creative_inputs, "creative_results.json")
+    # Offline mode trades latency for the Batch API discount; a vLLM server
+    # gets every prompt at once so it can batch them on the GPU
+    if use_batch or (vllm_backend.VLLM_URL and "groq" in models):
+        run_batch_comparisons(models, use_cache, use_batch, stream_to_file)
+        return
     
-    # Example 3: Code Generation
-    print("\n\n=== EXAMPLE 3: CODE GENERATION ===")
-    code_template = get_template("code_generation")
-    code_inputs = {
-        "language": "Python",
-        "task": "Create a function that calculates the Fibonacci sequence up to n terms using memoization",
-        "requirements": "- Include type hints\n- Include docstring\n- Handle edge cases"
-    }
-    compare_responses(models, code_template, code_inputs, "code_results.json")
+    # One event loop for every example so the shared connection pool stays warm between them
+    asyncio.run(arun_examples(models, use_cache, stream_to_file))
 
 if __name__ == "__main__":
-    run_comparisons()
+    parser = argparse.ArgumentParser(description="Compare responses from different LLMs")
+    parser.add_argument("--batch", action="store_true", help="Submit all prompts through provider Batch APIs (slower, cheaper)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore cached responses and call the APIs again")
+    parser.add_argument("--jsonl", metavar="PATH", help="Also append every response to PATH as JSON lines while the run progresses")
+    args = parser.parse_args()
+    
+    # Let LangChain's own cache absorb repeated calls too, unless a refresh was requested
+    if not args.no_cache:
+        from langchain.cache import SQLiteCache
+        from langchain.globals import set_llm_cache
+        set_llm_cache(SQLiteCache(database_path=".langchain.db"))
+    
+    run_comparisons(use_batch=args.batch, use_cache=not args.no_cache, stream_to_file=args.jsonl)
@@ -1,7 +1,11 @@
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
 import os
 import glob
 import re
+from concurrent.futures import ThreadPoolExecutor
 
 # --- Configuration ---
 DATA_DIR = "data"
@@ -17,6 +21,57 @@ def get_model_name_from_filename(filename):
     name_part = base.replace("-qna.csv", "")
     return name_part
 
+def load_answer(qna_file):
+    """Returns (renamed Answer column or None if it can't be used, log lines); the caller prints the lines in file order."""
+    log = []
+    model_name = get_model_name_from_filename(qna_file)
+    log.append(f"Processing {model_name} answers from {os.path.basename(qna_file)}...")
+
+    if os.path.getsize(qna_file) == 0:
+        log.append(f"  Warning: Skipping empty file {os.path.basename(qna_file)}.")
+        return None, log
+
+    try:
+        # Parse only the answer column with pyarrow's multithreaded reader; empty cells
+        # stay empty strings rather than nulls, like keep_default_na=False did
+        try:
+            table = pacsv.read_csv(
+                qna_file,
+                read_options=pacsv.ReadOptions(use_threads=True, encoding='utf-8'),
+                convert_options=pacsv.ConvertOptions(
+                    include_columns=[ANSWER_COLUMN],
+                    column_types={ANSWER_COLUMN: pa.string()}, # Never infer null/numeric types, so "NA" or "" stay text
+                    strings_can_be_null=False
+                )
+            )
+        except KeyError:
+            # include_columns raises when the requested column is absent
+            log.append(f"  Warning: Skipping {os.path.basename(qna_file)}. Missing required column '{ANSWER_COLUMN}'.")
+            return None, log
+
+        # Optional: Check if the row count matches expectations
+        if EXPECTED_ROW_COUNT is not None and table.num_rows != EXPECTED_ROW_COUNT:
+            log.append(f"  Warning: File {os.path.basename(qna_file)} has {table.num_rows} rows, expected {EXPECTED_ROW_COUNT}. Alignment might be incorrect.")
+
+        # Extract the answer column (zero-copy via ArrowDtype) and rename it
+        answer_series = table.column(0).to_pandas(types_mapper=pd.ArrowDtype).rename(f"Answer_{model_name}")
+        log.append(f"  Extracted answers for {model_name}.")
+        return answer_series, log
+
+    except Exception as e:
+        log.append(f"  Warning: Error processing file {os.path.basename(qna_file)}: {e}")
+    return None, log
+
+def to_arrow_column(series, length):
+    """Returns the Arrow data behind an answer Series, padded with empty strings to the given length."""
+    # Cast to text whatever type the column was read as, so padding and nulls write as "" like pandas did
+    column = pc.fill_null(pa.array(series).cast(pa.string()), "")
+    if len(column) < length:
+        # pd.concat padded shorter files with NaN, which to_csv(quoting=1) wrote as "";
+        # empty strings keep that output, where nulls would be written as bare empty fields
+        column = pa.concat_arrays([column, pa.array([""] * (length - len(column)), pa.string())])
+    return column
+
 # Find all Q&A files
 qna_files = sorted(glob.glob(QNA_FILE_PATTERN)) # Sort for consistent column order
 
@@ -28,46 +83,33 @@ print(f"Found {len(qna_files)} Q&A files to extract answers from:")
 for f in qna_files:
     print(f"  - {os.path.basename(f)}")
 
-all_answers = [] # List to hold each model's answer Series
-
-# Iterate through each Q&A file, extract and rename the Answer column
-for qna_file in qna_files:
-    model_name = get_model_name_from_filename(qna_file)
-    print(f"Processing {model_name} answers from {os.path.basename(qna_file)}...")
-
-    try:
-        temp_df = pd.read_csv(qna_file, keep_default_na=False, encoding='utf-8')
-
-        if ANSWER_COLUMN not in temp_df.columns:
-            print(f"  Warning: Skipping {os.path.basename(qna_file)}. Missing required column '{ANSWER_COLUMN}'.")
-            continue
-
-        # Optional: Check if the row count matches expectations
-        if EXPECTED_ROW_COUNT is not None and len(temp_df) != EXPECTED_ROW_COUNT:
-            print(f"  Warning: File {os.path.basename(qna_file)} has {len(temp_df)} rows, expected {EXPECTED_ROW_COUNT}. Alignment might be incorrect.")
+# Read the Q&A files concurrently; map() keeps the sorted order so columns stay deterministic
+with ThreadPoolExecutor(max_workers=min(32, len(qna_files))) as executor:
+    results = list(executor.map(load_answer, qna_files))
 
-        # Extract the answer column and rename it
-        answer_series = temp_df[ANSWER_COLUMN].rename(f"Answer_{model_name}")
-        all_answers.append(answer_series)
-        print(f"  Extracted answers for {model_name}.")
-
-    except pd.errors.EmptyDataError:
-        print(f"  Warning: Skipping empty file {os.path.basename(qna_file)}.")
-    except Exception as e:
-        print(f"  Warning: Error processing file {os.path.basename(qna_file)}: {e}")
+all_answers = []
+for series, log in results:
+    print("\n".join(log))
+    if series is not None:
+        all_answers.append(series)
 
-# Concatenate all answer Series horizontally
+# Assemble the answer columns side by side as one Arrow table, without a wide intermediate DataFrame
 if not all_answers:
     print("No answer columns were extracted. Output file will be empty.")
-    final_df = pd.DataFrame()
+    final_table = pa.table({})
 else:
-    final_df = pd.concat(all_answers, axis=1)
-    print(f"\nConcatenated answers from {len(final_df.columns)} sources.")
+    row_count = max(len(series) for series in all_answers)
+    final_table = pa.Table.from_arrays(
+        [to_arrow_column(series, row_count) for series in all_answers],
+        names=[series.name for series in all_answers]
+    )
+    print(f"\nConcatenated answers from {final_table.num_columns} sources.")
 
 # --- Save Results ---
 print(f"Saving answer comparison results to {OUTPUT_FILE}...")
 try:
-    final_df.to_csv(OUTPUT_FILE, index=False, quoting=1, encoding='utf-8')
+    # pyarrow's multithreaded C++ writer; "all_valid" quotes every value like csv.QUOTE_ALL
+    pacsv.write_csv(final_table, OUTPUT_FILE, write_options=pacsv.WriteOptions(quoting_style="all_valid"))
     print(f"Successfully created answer comparison file: {OUTPUT_FILE}")
 except Exception as e:
     print(f"Error writing output file {OUTPUT_FILE}: {e}")
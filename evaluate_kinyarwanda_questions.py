@@ -3,86 +3,145 @@ evaluate_kinyarwanda_questions.py - Evaluate Kinyarwanda questions across multip
 """
 
 import os
+import re
 import csv
 import json
+import random
+import contextlib
+import argparse
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
-from langchain_groq import ChatGroq
-from langchain.prompts import ChatPromptTemplate
-from googletrans import Translator
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import time
+import asyncio
+import llm_cache
+import http_pool
+from questions_data import KINYARWANDA_QUESTIONS, LOWERED_QUESTIONS, detect_topic_category
 
 # Load environment variables
 load_dotenv()
 
-# Define the questions
-KINYARWANDA_QUESTIONS = [
-    "Kubera iki mumaze igihe kinini mutaduha uburenganzira bwo gufungura Irembo ryacu? Ndashaka nanjye kujya mfasha abantu kubona serivisi z'Irembo",
-    "Ese umuntu ashaka akazi mu Irembo yabavugisha gute?",
-    "Icyangombwa cyanjye cy'ubutaka narakibuze kandi ngejeje igihe cyo gutanga umusoro, ubwo nakibona gute ngo mbashe kwishyura imisoro",
-    "Ese ko mbona gusaba pasiporo bitari gukunda mwamfasha kuyinsabira",
-    "Ese Irembo, iyo umuntu amaze kwiyandikisha kuri permit ntabone code yiwe biba byagenze gute ubwo?",
-    "Aka message mwampaye narakabuze kandi ejo mfite examen. nakabona gute?",
-    "Icyumweru gishize niyandikishije ku kizami ariko sinibuka italiki y'ikizamini. Munyibutse italiki",
-    "Nijoro niyandikishije ariko ndi kwishyura bikanga. Kandi ndabishaka cyane mumfashe",
-    "Nasabye icyemezo gisimbura indangamuntu ariko ntabwo nibuka numero yanjye ya dosiye. Mwanyibutsa?",
-    "Ndikugerageza kudownloadinga icyemezo cyanjye cy'amavuko nk'ibisanzwe ariko ntibikunda sinzi ikibazo kirimo",
-    "Maze kwiyandikisha ariko nsanze nashyizemo kuzakorera Rusizi kandi nashakaga Musanze. Munkuriremo iyo dosiye nongere niyandikishe",
-    "Ese birashoboka ko mwampindurira uwo twari kuzashakana nkashyiraho undi. Nandikishije ishyingirwa ariko uwo twari kuzashakana yarabyanze nshaka undi",
-    "Ndashaka kwishyura imisoro hakiri kare bataramfungira.",
-    "Nabonye ku mbuga zanyu mwatumenyesheje ko mushobora kudufasha gusimbuza amafoto yo ku ndangamuntu, ndasabwa iki?",
-    "Mu kwiyandikisha kuri permit, kuki buri gihe nsangamo imyanya yo muri Busanza gusa?",
-    "Maze kwishyura Traffic fine ariko nsanga n'umushoferi wanjye nawe yishyuye, ubwo ayo mafaranga turayasubizwa bigenze gute?",
-    "ko ubushize nasabye icyemezo cy'uko ntafunzwe nkahita nkibona, ubu bwo kuki cyatinze? kimaze icyumweru kirenga.",
-    "Twasabye ibyemezo by'uko tutafunzwe njye na madamu n'umuhungu wanjye ariko bo barabibonye njye sinzi impamvu byatinze",
-    "Nifuzaga kumenya aho icyangombwa cyanjye cy'ubutaka kigeze kuko twakoze mutation ukwezi gushize kandi sindabona icyangombwa cyanjye",
-    "Mvuye mu kizamini ariko nahise nzimya machine ntabonye amanota yanjye, mwamfasha kuyamenya"
-]
-
-# Define topic categories for mapping
-TOPIC_CATEGORIES = {
-    "irembo": "Irembo Services",
-    "akazi": "Employment",
-    "ubutaka": "Land Registration",
-    "pasiporo": "Passport Services",
-    "permit": "Permits and Licenses",
-    "examen": "Examinations",
-    "kizami": "Examinations",
-    "indangamuntu": "National ID",
-    "icyemezo": "Certificates",
-    "amavuko": "Birth Certificate",
-    "ishyingirwa": "Marriage Registration",
-    "imisoro": "Taxes",
-    "amafoto": "Documentation",
-    "Traffic fine": "Traffic Fines",
-    "ntafunzwe": "Criminal Record Certificate",
-    "machine": "Technical Issues",
-    "amanota": "Examinations"
+# Upper bound on requests in flight at once per provider, to stay inside each provider's rate limits
+PROVIDER_CONCURRENCY = {
+    "openai": int(os.getenv("OPENAI_MAX_CONCURRENCY", "20")),
+    "anthropic": int(os.getenv("ANTHROPIC_MAX_CONCURRENCY", "5")),
+    "groq": int(os.getenv("GROQ_MAX_CONCURRENCY", "10")),
+    "google": int(os.getenv("GOOGLE_TRANSLATE_MAX_CONCURRENCY", "8"))
 }
 
+# Provider behind each evaluation model
+MODEL_PROVIDERS = {
+    "gpt-4o": "openai",
+    "gpt-3.5-turbo": "openai",
+    "gpt-4-turbo": "openai",
+    "claude-3-sonnet": "anthropic",
+    "claude-3-haiku": "anthropic",
+    "grok-3": "groq"
+}
+
+# Questions scored per fluency request; small enough to stay well inside context limits
+FLUENCY_BATCH_SIZE = 10
+
+# Retries for rate-limited provider calls, backing off 1s, 2s, 4s, ... up to the cap
+BACKOFF_ATTEMPTS = 5
+BACKOFF_MAX_DELAY = 60
+
+# One Translator, and so one HTTP session, for every translation in the process; created on first use
+_TRANSLATOR = None
+
+# Prompts are plain format strings built once at import and sent as a single user message
+_FLUENCY_TMPL = """
+You are a fluency evaluator for Kinyarwanda language. 
+
+Please evaluate the fluency of the following Kinyarwanda question on a scale of 1-10, 
+where 1 is completely unnatural and 10 is perfectly natural, fluent Kinyarwanda.
+
+Only respond with a single number between 1 and 10, with no additional explanations.
+
+Question: {question}
+"""
+
+_FLUENCY_BATCH_TMPL = """
+You are a fluency evaluator for Kinyarwanda language. 
+
+Please evaluate the fluency of each of the following {count} Kinyarwanda questions on a scale of 1-10, 
+where 1 is completely unnatural and 10 is perfectly natural, fluent Kinyarwanda.
+
+Return only a JSON list of {count} integers between 1 and 10, one per question, in order, 
+with no additional explanations.
+
+Questions:
+{questions}
+"""
+
+_ANSWER_TMPL = """
+You are a helpful assistant who speaks fluent Kinyarwanda. 
+
+Respond to the following question in Kinyarwanda. Keep your answer professional, 
+helpful, and concise (1-3 sentences maximum).
+
+Question: {question}
+
+Answer in Kinyarwanda:
+"""
+
+# (model name, CSV column) in column order, for the models that may be available
+_MODEL_HEADER_ORDER = (
+    ("gpt-4o", "gpt-4o fluency score *"),
+    ("gpt-3.5-turbo", "gpt-03-mini fluency score *"),
+    ("gpt-4-turbo", "gpt-01-preview fluency score *"),
+    ("claude-3-sonnet", "claude-sonnet-3.7 fluency score *"),
+    ("claude-3-haiku", "claude-sonnet-3.5 fluency score *"),
+    ("grok-3", "grok-3 fluency score *")
+)
+
+# Columns of the manual-completion template
+TEMPLATE_HEADERS = (
+    "Question", 
+    "Answer", 
+    "Topic Category", 
+    "gpt-4o fluency score *", 
+    "gpt-03-mini fluency score *", 
+    "gpt-01-preview fluency score *", 
+    "claude-sonnet-3.7 fluency score *", 
+    "claude-sonnet-3.5 fluency score *", 
+    "grok-3 fluency score *", 
+    "gemini-flash-2.0 fluency score *", 
+    "google-translate"
+)
+
+# First standalone 1-10 in a fluency reply
+_SCORE_RE = re.compile(r'\b(10|[1-9])\b')
+
+# In-flight Google translations keyed by (src, dest, text)
+_pending_translations = {}
+
 # Initialize language models
 def initialize_models():
     """Initialize the language models to be used for evaluation."""
     models = {}
     
+    # OpenAI and Groq clients share one keep-alive connection pool (ChatAnthropic has no http_client option)
+    pooled = http_pool.client_kwargs()
+    
     # OpenAI models
+    # Provider SDKs are imported only when their key is set, keeping template mode fast to start
     if os.getenv("OPENAI_API_KEY"):
-        models["gpt-4o"] = ChatOpenAI(model="gpt-4o", temperature=0)
+        from langchain_openai import ChatOpenAI
+        
+        models["gpt-4o"] = ChatOpenAI(model="gpt-4o", temperature=0, **pooled)
         
         try:
-            models["gpt-3.5-turbo"] = ChatOpenAI(model="gpt-3.5-turbo", temperature=0)
+            models["gpt-3.5-turbo"] = ChatOpenAI(model="gpt-3.5-turbo", temperature=0, **pooled)
         except:
             print("Warning: gpt-3.5-turbo model not available")
             
         try:
-            models["gpt-4-turbo"] = ChatOpenAI(model="gpt-4-turbo-preview", temperature=0)
+            models["gpt-4-turbo"] = ChatOpenAI(model="gpt-4-turbo-preview", temperature=0, **pooled)
         except:
             print("Warning: gpt-4-turbo-preview model not available")
     
     # Claude models
     if os.getenv("ANTHROPIC_API_KEY"):
+        from langchain_anthropic import ChatAnthropic
+        
         try:
             models["claude-3-sonnet"] = ChatAnthropic(model="claude-3-sonnet-20240229", temperature=0)
         except:
@@ -95,98 +154,288 @@ def initialize_models():
     
     # Groq model
     if os.getenv("GROQ_API_KEY"):
+        from langchain_groq import ChatGroq
+        
         try:
-            models["grok-3"] = ChatGroq(model="llama3-70b-8192", temperature=0)
+            models["grok-3"] = ChatGroq(model="llama3-70b-8192", temperature=0, **pooled)
         except:
             print("Warning: grok model not available")
     
     return models
 
-def translate_with_google(text, src='rw', dest='en'):
-    """Translate text using Google Translate."""
+def get_translator():
+    """Return the shared googletrans Translator, importing and creating it on first use."""
+    global _TRANSLATOR
+    if _TRANSLATOR is None:
+        from googletrans import Translator
+        _TRANSLATOR = Translator()
+    return _TRANSLATOR
+
+async def translate_with_google(text, src='rw', dest='en'):
+    """Translate text using Google Translate, reusing earlier translations from the on-disk cache."""
+    cache_key = llm_cache.make_key("google-translate", src, dest, text)
+    cached = llm_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     try:
-        translator = Translator()
-        result = translator.translate(text, src=src, dest=dest)
+        # googletrans 4.x is async, so translations overlap on the event loop
+        result = await get_translator().translate(text, src=src, dest=dest)
+        llm_cache.set(cache_key, result.text)
         return result.text
     except Exception as e:
         print(f"Google Translate error: {str(e)}")
         return f"Error: {str(e)}"
 
-def detect_topic_category(question):
-    """Detect the topic category based on keywords in the question."""
-    question_lower = question.lower()
-    
-    for keyword, category in TOPIC_CATEGORIES.items():
-        if keyword.lower() in question_lower:
-            return category
-    
-    return "Other"
+async def translate_async(text, src='rw', dest='en'):
+    """Translate text concurrently with other work; concurrent requests for the same text share one call."""
+    key = (src, dest, text)
+    # No await between the lookup and the insert, so no lock is needed on the event loop
+    task = _pending_translations.get(key)
+    if task is None:
+        task = asyncio.ensure_future(translate_with_google(text, src, dest))
+        _pending_translations[key] = task
+        task.add_done_callback(lambda _: _pending_translations.pop(key, None))
+    return await task
+
+def get_cache_key(model, task, prompt):
+    """Return the response cache key for a call, or None if the model isn't deterministic."""
+    if model.temperature != 0:
+        return None
+    model_id = getattr(model, "model_name", None) or model.model
+    return llm_cache.make_key(model_id, task, prompt)
 
-def evaluate_fluency(model, question, model_name):
+def is_rate_limited(error):
+    """Return True if a provider error is an HTTP 429 / RateLimitError worth retrying."""
+    # Every provider SDK names its 429 error RateLimitError, so no SDK import is needed here
+    return type(error).__name__ == "RateLimitError" or getattr(error, "status_code", None) == 429
+
+async def ainvoke_with_backoff(model, messages, semaphore=None, attempts=BACKOFF_ATTEMPTS):
+    """Call model.ainvoke, retrying rate-limited calls with capped exponential backoff and jitter."""
+    for attempt in range(attempts):
+        try:
+            # The provider's slot is held only for the request itself, never across a backoff sleep
+            async with semaphore or contextlib.nullcontext():
+                return await model.ainvoke(messages)
+        except Exception as e:
+            if not is_rate_limited(e) or attempt == attempts - 1:
+                raise
+            delay = min(2 ** attempt, BACKOFF_MAX_DELAY) + random.random()
+            print(f"Rate limited, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+async def evaluate_fluency_async(model, question, model_name, use_cache=True, semaphore=None):
     """Evaluate the fluency of a Kinyarwanda question using the provided model."""
     try:
-        prompt_template = """
-        You are a fluency evaluator for Kinyarwanda language. 
-        
-        Please evaluate the fluency of the following Kinyarwanda question on a scale of 1-10, 
-        where 1 is completely unnatural and 10 is perfectly natural, fluent Kinyarwanda.
-        
-        Only respond with a single number between 1 and 10, with no additional explanations.
+        formatted_prompt = _FLUENCY_TMPL.format(question=question)
         
-        Question: {question}
-        """
-        
-        prompt = ChatPromptTemplate.from_template(prompt_template)
-        formatted_prompt = prompt.format(question=question)
+        # Deterministic (temperature 0) scores are reused from the on-disk cache, keyed by question
+        # so the batch path finds scores this fallback stored and vice versa
+        cache_key = get_cache_key(model, "fluency", question)
+        if cache_key and use_cache:
+            cached = llm_cache.get(cache_key)
+            if cached is not None:
+                return int(cached)
         
         messages = [{"role": "user", "content": formatted_prompt}]
-        response = model.invoke(messages)
+        response = await ainvoke_with_backoff(model, messages, semaphore)
         
-        # Extract just the number from the response
-        score = response.content.strip()
-        # Handle potential non-numeric responses
-        try:
-            score = int(score)
-            if score < 1:
-                score = 1
-            elif score > 10:
-                score = 10
-        except:
-            print(f"Non-numeric score from {model_name}: {score}, defaulting to 5")
+        # Extract the first 1-10 number from the response
+        match = _SCORE_RE.search(response.content)
+        if match:
+            score = int(match.group(1))
+        else:
+            print(f"Non-numeric score from {model_name}: {response.content.strip()}, defaulting to 5")
             score = 5
+        
+        if cache_key:
+            llm_cache.set(cache_key, str(score))
             
         return score
     except Exception as e:
         print(f"Error evaluating with {model_name}: {str(e)}")
         return "Error"
 
-def answer_question(model, question):
-    """Generate an answer for a Kinyarwanda question using the provided model."""
+def parse_score_list(content, count):
+    """Parse a JSON list of count scores from a model response, or return None if it doesn't fit."""
+    match = re.search(r"\[.*?\]", content, re.DOTALL)
+    if not match:
+        return None
+    
     try:
-        prompt_template = """
-        You are a helpful assistant who speaks fluent Kinyarwanda. 
-        
-        Respond to the following question in Kinyarwanda. Keep your answer professional, 
-        helpful, and concise (1-3 sentences maximum).
-        
-        Question: {question}
+        values = json.loads(match.group(0))
+        if len(values) != count:
+            return None
+        return [min(max(int(value), 1), 10) for value in values]
+    except (TypeError, ValueError):
+        return None
+
+async def evaluate_fluency_batch(model, questions, model_name, use_cache=True, semaphore=None):
+    """Evaluate the fluency of several Kinyarwanda questions in one call, returning scores in question order."""
+    # Deterministic (temperature 0) scores are reused from the on-disk cache
+    scores = [None] * len(questions)
+    cache_keys = [get_cache_key(model, "fluency", question) for question in questions]
+    for i, cache_key in enumerate(cache_keys):
+        if cache_key and use_cache:
+            cached = llm_cache.get(cache_key)
+            if cached is not None:
+                scores[i] = int(cached)
+    
+    pending = [i for i, score in enumerate(scores) if score is None]
+    if not pending:
+        return scores
+    
+    batch_scores = None
+    try:
+        formatted_prompt = _FLUENCY_BATCH_TMPL.format(
+            count=len(pending),
+            questions="\n".join(f"{n}. {questions[i]}" for n, i in enumerate(pending, start=1))
+        )
         
-        Answer in Kinyarwanda:
-        """
+        messages = [{"role": "user", "content": formatted_prompt}]
+        response = await ainvoke_with_backoff(model, messages, semaphore)
+        batch_scores = parse_score_list(response.content, len(pending))
+    except Exception as e:
+        print(f"Error batch-evaluating with {model_name}: {str(e)}")
+    
+    if batch_scores is None:
+        # Fall back to one call per question when the list can't be used
+        print(f"Falling back to per-question fluency evaluation with {model_name}")
+        batch_scores = await asyncio.gather(*(evaluate_fluency_async(model, questions[i], model_name, use_cache, semaphore) for i in pending))
+    else:
+        for i, score in zip(pending, batch_scores):
+            if cache_keys[i]:
+                llm_cache.set(cache_keys[i], str(score))
+    
+    for i, score in zip(pending, batch_scores):
+        scores[i] = score
+    
+    return scores
+
+async def answer_question_async(model, question, semaphore=None):
+    """Generate an answer for a Kinyarwanda question using the provided model."""
+    try:
+        formatted_prompt = _ANSWER_TMPL.format(question=question)
         
-        prompt = ChatPromptTemplate.from_template(prompt_template)
-        formatted_prompt = prompt.format(question=question)
+        # Deterministic (temperature 0) answers are reused from the on-disk cache
+        cache_key = get_cache_key(model, "answer", formatted_prompt)
+        if cache_key:
+            cached = llm_cache.get(cache_key)
+            if cached is not None:
+                return cached
         
         messages = [{"role": "user", "content": formatted_prompt}]
-        response = model.invoke(messages)
+        response = await ainvoke_with_backoff(model, messages, semaphore)
+        
+        answer = response.content.strip()
+        if cache_key:
+            llm_cache.set(cache_key, answer)
         
-        return response.content.strip()
+        return answer
     except Exception as e:
         print(f"Error answering question: {str(e)}")
         return f"Error: {str(e)}"
 
-def generate_csv():
-    """Generate a CSV file with questions, answers, categories, and fluency scores."""
+async def process_question(question, answer_model, fluency_task, answer_semaphore, limit_translation):
+    """Answer, translate and score a single question, with all provider calls in flight at once."""
+    # Detect topic category
+    topic_category = detect_topic_category(question)
+    
+    # Run the answer and Google translation alongside the question's fluency scores
+    answer_task = answer_question_async(answer_model, question, answer_semaphore) if answer_model else asyncio.sleep(0, result="")
+    translation_task = limit_translation(translate_async(question))
+    answer, google_translation, fluency_scores = await asyncio.gather(answer_task, translation_task, fluency_task)
+    
+    return {
+        "question": question,
+        "answer": answer,
+        "topic_category": topic_category,
+        "fluency_scores": fluency_scores,
+        "google_translation": google_translation
+    }
+
+def get_scores_key(models, question):
+    """Cache key for all of a question's fluency scores from this set of models."""
+    return llm_cache.make_key("fluency-scores", *sorted(models), question)
+
+async def process_questions(questions, models, on_result, use_cache=True):
+    """Process all questions concurrently, calling on_result as each finishes; returns results in question order."""
+    # Generate answers using one of the models (if available)
+    answer_model_name = None
+    if "gpt-4o" in models:
+        answer_model_name = "gpt-4o"
+    elif "claude-3-sonnet" in models:
+        answer_model_name = "claude-3-sonnet"
+    elif models:
+        # Use the first available model
+        answer_model_name = next(iter(models))
+    answer_model = models.get(answer_model_name)
+    
+    # One semaphore per provider, so a slow or strict provider doesn't hold back the others
+    semaphores = {provider: asyncio.Semaphore(limit) for provider, limit in PROVIDER_CONCURRENCY.items()}
+    completed = []
+    
+    def limited(provider):
+        # Bound the number of requests in flight to one provider (model calls take the semaphore per request instead)
+        semaphore = semaphores[provider]
+        
+        async def run_limited(coro):
+            async with semaphore:
+                return await coro
+        return run_limited
+    
+    # Questions already scored by this set of models skip fluency evaluation entirely
+    cached_scores = {}
+    if use_cache:
+        for question in questions:
+            cached = llm_cache.get(get_scores_key(models, question))
+            if cached is not None:
+                cached_scores[question] = json.loads(cached)
+    to_score = [question for question in questions if question not in cached_scores]
+    positions = {question: j for j, question in enumerate(to_score)}
+    
+    # Each model scores the remaining questions in chunks, one call per chunk
+    batch_tasks = {}
+    for model_name, model in models.items():
+        for start in range(0, len(to_score), FLUENCY_BATCH_SIZE):
+            chunk = to_score[start:start + FLUENCY_BATCH_SIZE]
+            batch_tasks[(model_name, start)] = asyncio.ensure_future(evaluate_fluency_batch(model, chunk, model_name, use_cache, semaphores[MODEL_PROVIDERS[model_name]]))
+    
+    async def score(question):
+        if question in cached_scores:
+            return cached_scores[question]
+        
+        # Pick this question's score out of each model's batch
+        j = positions[question]
+        start = j - j % FLUENCY_BATCH_SIZE
+        fluency_scores = {model_name: (await batch_tasks[(model_name, start)])[j - start] for model_name in models}
+        
+        # Only complete score sets are reused by later runs
+        if "Error" not in fluency_scores.values():
+            llm_cache.set(get_scores_key(models, question), json.dumps(fluency_scores))
+        return fluency_scores
+    
+    async def run(i, question):
+        result = await process_question(question, answer_model, score(question), semaphores[MODEL_PROVIDERS.get(answer_model_name, "openai")], limited("google"))
+        completed.append(result)
+        print(f"Finished question {i+1}/{len(questions)} ({len(completed)} done)")
+        on_result(result)
+        return result
+    
+    return await asyncio.gather(*(run(i, question) for i, question in enumerate(questions)))
+
+def build_csv_row(result, models):
+    """Build the CSV row for one question's result, with fluency scores in column order."""
+    return [
+        result["question"],
+        result["answer"],
+        result["topic_category"],
+        *[result["fluency_scores"].get(model_name, "") for model_name, _ in _MODEL_HEADER_ORDER if model_name in models],
+        result["google_translation"]
+    ]
+
+def generate_csv(force_refresh=False):
+    """Generate a CSV file with questions, answers, categories, and fluency scores (force_refresh re-scores cached questions)."""
     # Initialize models
     print("Initializing language models...")
     models = initialize_models()
@@ -197,190 +446,106 @@ def generate_csv():
     
     # Define CSV headers based on available models
     headers = ["Question", "Answer", "Topic Category"]
-    model_columns = []
     
-    # Add available model columns
-    if "gpt-4o" in models:
-        model_columns.append("gpt-4o fluency score *")
-    if "gpt-3.5-turbo" in models:
-        model_columns.append("gpt-03-mini fluency score *")
-    if "gpt-4-turbo" in models:
-        model_columns.append("gpt-01-preview fluency score *")
-    if "claude-3-sonnet" in models:
-        model_columns.append("claude-sonnet-3.7 fluency score *")
-    if "claude-3-haiku" in models:
-        model_columns.append("claude-sonnet-3.5 fluency score *")
-    if "grok-3" in models:
-        model_columns.append("grok-3 fluency score *")
-    
-    # Add Google Translate column
-    model_columns.append("google-translate")
+    # Add available model columns, then the Google Translate column
+    model_columns = [header for model_name, header in _MODEL_HEADER_ORDER if model_name in models] + ["google-translate"]
     
     headers.extend(model_columns)
     
     # Create CSV file
     csv_file_path = "kinyarwanda_evaluation.csv"
-    temp_results_path = "temp_results.json"
     
-    # Check if we have partial results saved
-    partial_results = []
-    if os.path.exists(temp_results_path):
+    # The CSV doubles as the checkpoint: questions already in it from an earlier run are skipped
+    completed_questions = set()
+    resume = False
+    if os.path.exists(csv_file_path):
         try:
-            with open(temp_results_path, 'r', encoding='utf-8') as f:
-                partial_results = json.load(f)
-            print(f"Loaded {len(partial_results)} partial results from {temp_results_path}")
+            with open(csv_file_path, 'r', newline='', encoding='utf-8') as f:
+                reader = csv.reader(f)
+                resume = next(reader, None) == headers
+                if resume:
+                    completed_questions = {row[0] for row in reader if row}
+                    print(f"Resuming with {len(completed_questions)} questions already in {csv_file_path}")
+                else:
+                    print(f"Columns in {csv_file_path} don't match the available models, starting over")
         except Exception as e:
             print(f"Error loading partial results: {str(e)}")
+            resume = False
+            completed_questions = set()
     
-    # Process questions
-    all_results = []
-    completed_questions = [item["question"] for item in partial_results]
-    
-    # Add any new questions that aren't in partial results
+    # Add any new questions that aren't in the CSV yet
     questions_to_process = [q for q in KINYARWANDA_QUESTIONS if q not in completed_questions]
     
     # Process each question
     print(f"Processing {len(questions_to_process)} new questions...")
     
-    for i, question in enumerate(questions_to_process):
-        print(f"Processing question {i+1}/{len(questions_to_process)}")
-        
-        # Detect topic category
-        topic_category = detect_topic_category(question)
-        
-        # Generate an answer using one of the models (if available)
-        answer = ""
-        answer_model = None
-        if "gpt-4o" in models:
-            answer_model = models["gpt-4o"]
-        elif "claude-3-sonnet" in models:
-            answer_model = models["claude-3-sonnet"]
-        elif models:
-            # Use the first available model
-            model_name, answer_model = next(iter(models.items()))
-        
-        if answer_model:
-            print(f"Generating answer using model...")
-            answer = answer_question(answer_model, question)
-        
-        # Evaluate fluency across models
-        fluency_scores = {}
-        for model_name, model in models.items():
-            print(f"Evaluating fluency with {model_name}...")
-            score = evaluate_fluency(model, question, model_name)
-            fluency_scores[model_name] = score
-        
-        # Translate with Google Translate
-        print("Translating with Google Translate...")
-        google_translation = translate_with_google(question)
-        
-        # Store results
-        result = {
-            "question": question,
-            "answer": answer,
-            "topic_category": topic_category,
-            "fluency_scores": fluency_scores,
-            "google_translation": google_translation
-        }
-        
-        all_results.append(result)
-        
-        # Save partial results after each question
-        with open(temp_results_path, 'w', encoding='utf-8') as f:
-            json.dump(partial_results + all_results, f, ensure_ascii=False, indent=2)
-        
-        # Sleep briefly to avoid rate limits
-        time.sleep(1)
-    
-    # Combine partial and new results
-    all_results = partial_results + all_results
-    
-    # Write to CSV
-    with open(csv_file_path, 'w', newline='', encoding='utf-8') as csv_file:
+    # Rows are appended in question order as soon as every earlier question is done, and flushed,
+    # so the file always holds a prefix of the questions and a crash loses at most those in flight
+    with open(csv_file_path, 'a' if resume else 'w', newline='', encoding='utf-8') as csv_file:
         writer = csv.writer(csv_file)
         
         # Write the headers
-        writer.writerow(headers)
+        if not resume:
+            writer.writerow(headers)
+            csv_file.flush()
         
-        # Write each question with its data
-        for result in all_results:
-            row = [
-                result["question"],
-                result["answer"],
-                result["topic_category"]
-            ]
-            
-            # Add fluency scores in the right order
-            if "gpt-4o" in models:
-                row.append(result["fluency_scores"].get("gpt-4o", ""))
-            if "gpt-3.5-turbo" in models:
-                row.append(result["fluency_scores"].get("gpt-3.5-turbo", ""))
-            if "gpt-4-turbo" in models:
-                row.append(result["fluency_scores"].get("gpt-4-turbo", ""))
-            if "claude-3-sonnet" in models:
-                row.append(result["fluency_scores"].get("claude-3-sonnet", ""))
-            if "claude-3-haiku" in models:
-                row.append(result["fluency_scores"].get("claude-3-haiku", ""))
-            if "grok-3" in models:
-                row.append(result["fluency_scores"].get("grok-3", ""))
-            
-            # Add Google translation
-            row.append(result["google_translation"])
-            
-            writer.writerow(row)
+        finished = {}
+        next_row = 0
+        
+        def on_result(result):
+            nonlocal next_row
+            finished[result["question"]] = result
+            while next_row < len(questions_to_process) and questions_to_process[next_row] in finished:
+                writer.writerow(build_csv_row(finished[questions_to_process[next_row]], models))
+                next_row += 1
+            csv_file.flush()
+        
+        # Every question is processed concurrently
+        new_results = asyncio.run(process_questions(questions_to_process, models, on_result, use_cache=not force_refresh))
     
     print(f"CSV file created successfully: {csv_file_path}")
-    print(f"Total questions processed: {len(all_results)}")
+    print(f"Total questions processed: {len(completed_questions) + len(new_results)}")
+
+async def translate_questions(questions):
+    """Translate every question at once and return the translations in question order."""
+    return await asyncio.gather(*(translate_async(question) for question in questions))
 
 def create_simple_csv():
     """Create a simple CSV with just the questions and empty columns for manual completion."""
-    headers = [
-        "Question", 
-        "Answer", 
-        "Topic Category", 
-        "gpt-4o fluency score *", 
-        "gpt-03-mini fluency score *", 
-        "gpt-01-preview fluency score *", 
-        "claude-sonnet-3.7 fluency score *", 
-        "claude-sonnet-3.5 fluency score *", 
-        "grok-3 fluency score *", 
-        "gemini-flash-2.0 fluency score *", 
-        "google-translate"
-    ]
-    
     csv_file_path = "kinyarwanda_questions_template.csv"
     
+    # Translate all questions concurrently before writing; failures come back as "Error: ..."
+    translations = asyncio.run(translate_questions(KINYARWANDA_QUESTIONS))
+    
     with open(csv_file_path, 'w', newline='', encoding='utf-8') as csv_file:
         writer = csv.writer(csv_file)
         
         # Write the headers
-        writer.writerow(headers)
+        writer.writerow(TEMPLATE_HEADERS)
         
-        # Add topic categories automatically
-        for question in KINYARWANDA_QUESTIONS:
-            topic = detect_topic_category(question)
-            google_translation = ""
-            try:
-                # Try to get Google translation
-                google_translation = translate_with_google(question)
-            except:
-                pass
-            
-            # Create a row with the question, empty answer, topic category, and empty scores
-            row = [question, "", topic] + [""] * 7 + [google_translation]
-            writer.writerow(row)
+        # One row per question with the question, empty answer, topic category, empty scores and translation
+        empty_scores = [""] * 7
+        writer.writerows(
+            [question, "", detect_topic_category(lowered, already_lowered=True), *empty_scores, google_translation]
+            for question, lowered, google_translation in zip(KINYARWANDA_QUESTIONS, LOWERED_QUESTIONS, translations)
+        )
     
     print(f"Simple CSV template created: {csv_file_path}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate Kinyarwanda questions across multiple LLMs for fluency")
+    parser.add_argument("--full", action="store_true", help="Generate the full CSV with model evaluations instead of the simple template")
+    parser.add_argument("--force-refresh", action="store_true", help="Re-score every question instead of reusing cached fluency scores")
+    args = parser.parse_args()
+    
     print("Choose an option:")
     print("1. Generate full CSV with model evaluations (requires API keys)")
     print("2. Create simple CSV template (only requires Google Translate)")
     
-    option = "2"  # Default to simple template
-    print(f"Using option {option} (simple CSV template)")
+    option = "1" if args.full else "2"  # Default to simple template
+    print(f"Using option {option} ({'full evaluation' if args.full else 'simple CSV template'})")
     
     if option == "1":
-        generate_csv()
+        generate_csv(force_refresh=args.force_refresh)
     else:
         create_simple_csv()
@@ -0,0 +1,72 @@
+"""
+http_pool.py - Shared HTTP connection pools for the LLM provider clients
+"""
+
+import asyncio
+import weakref
+import httpx
+
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 50
+TIMEOUT = 60
+
+_sync_client = None
+_async_client = None
+
+class PerLoopTransport(httpx.AsyncBaseTransport):
+    """Async transport that keeps a separate connection pool for each event loop.
+
+    Pooled connections belong to the loop that opened them, so a pool reused after
+    its asyncio.run() has finished fails with "Event loop is closed".
+    """
+
+    def __init__(self):
+        self._transports = weakref.WeakKeyDictionary()
+
+    def _get_transport(self):
+        loop = asyncio.get_running_loop()
+        transport = self._transports.get(loop)
+        if transport is None:
+            transport = httpx.AsyncHTTPTransport(
+                http2=True,
+                limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS)
+            )
+            self._transports[loop] = transport
+        return transport
+
+    async def handle_async_request(self, request):
+        return await self._get_transport().handle_async_request(request)
+
+    async def aclose(self):
+        transport = self._transports.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport.aclose()
+
+def get_sync_client():
+    """Return the process-wide httpx.Client, creating it on first use."""
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = httpx.Client(
+            http2=True,
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS),
+            timeout=TIMEOUT
+        )
+    return _sync_client
+
+def get_async_client():
+    """Return the process-wide httpx.AsyncClient, creating it on first use.
+
+    Each event loop gets its own pool, so the client stays usable across
+    repeated asyncio.run() calls.
+    """
+    global _async_client
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(transport=PerLoopTransport(), timeout=TIMEOUT)
+    return _async_client
+
+def client_kwargs():
+    """Constructor kwargs that point a LangChain OpenAI/Groq chat model at the shared pools."""
+    return {
+        "http_client": get_sync_client(),
+        "http_async_client": get_async_client()
+    }
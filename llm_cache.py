@@ -0,0 +1,38 @@
+"""
+llm_cache.py - Persistent on-disk cache for LLM responses, backed by SQLite
+"""
+
+import hashlib
+import sqlite3
+import threading
+
+CACHE_PATH = ".llm_cache.db"
+
+_connection = None
+_lock = threading.Lock()
+
+def _connect():
+    """Open the cache database on first use."""
+    global _connection
+    if _connection is None:
+        _connection = sqlite3.connect(CACHE_PATH, check_same_thread=False)
+        _connection.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, val TEXT)")
+        _connection.commit()
+    return _connection
+
+def make_key(*parts):
+    """Build a cache key from the parts that determine a response (model, settings, prompt)."""
+    return hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+def get(key):
+    """Return the cached value for key, or None on a miss."""
+    with _lock:
+        row = _connect().execute("SELECT val FROM cache WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+def set(key, value):
+    """Store value under key, replacing any previous entry."""
+    with _lock:
+        connection = _connect()
+        connection.execute("INSERT OR REPLACE INTO cache (key, val) VALUES (?, ?)", (key, value))
+        connection.commit()
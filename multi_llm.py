@@ -4,12 +4,6 @@ multi_llm.py - A script to compare responses from different LLM providers using
 
 import os
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
-from langchain_groq import ChatGroq
-from langchain.schema import HumanMessage
-from langchain.prompts import ChatPromptTemplate
-from langchain.chains import LLMChain
 
 # Load environment variables from .env file
 load_dotenv()
@@ -28,8 +22,10 @@ def initialize_models():
     """Initialize LLM models from different providers."""
     models = {}
     
+    # Provider SDKs are imported only when their key is set
     # Initialize OpenAI
     if os.getenv("OPENAI_API_KEY"):
+        from langchain_openai import ChatOpenAI
         models["openai"] = ChatOpenAI(
             model="gpt-4o",
             temperature=0.7
@@ -37,6 +33,7 @@ def initialize_models():
     
     # Initialize Claude
     if os.getenv("ANTHROPIC_API_KEY"):
+        from langchain_anthropic import ChatAnthropic
         models["claude"] = ChatAnthropic(
             model="claude-3-opus-20240229",
             temperature=0.7
@@ -44,6 +41,7 @@ def initialize_models():
     
     # Initialize Groq
     if os.getenv("GROQ_API_KEY"):
+        from langchain_groq import ChatGroq
         models["groq"] = ChatGroq(
             model="llama3-70b-8192",
             temperature=0.7
@@ -53,6 +51,8 @@ def initialize_models():
 
 def run_prompt(models, prompt):
     """Run the same prompt on all available models and collect responses."""
+    from langchain.schema import HumanMessage
+    
     results = {}
     
     for model_name, model in models.items():
@@ -71,6 +71,9 @@ def run_prompt(models, prompt):
 
 def run_chain_example(models):
     """Run a simple LangChain example with a prompt template."""
+    from langchain.prompts import ChatPromptTemplate
+    from langchain.chains import LLMChain
+    
     print("\n=== RUNNING CHAIN EXAMPLE ===")
     
     # Define a prompt template
@@ -62,15 +62,16 @@ Based on the context above, please answer the following question:
 If the answer is not in the context, please say "I don't have enough information to answer this question."
 """)
 
+# Templates by name, built once at import
+TEMPLATES = {
+    "summarization": SUMMARIZATION_TEMPLATE,
+    "creative_writing": CREATIVE_WRITING_TEMPLATE,
+    "comparison": COMPARISON_TEMPLATE,
+    "code_generation": CODE_GENERATION_TEMPLATE,
+    "qa": QA_TEMPLATE,
+}
+
 # Function to get a template by name
 def get_template(template_name):
     """Get a prompt template by name."""
-    templates = {
-        "summarization": SUMMARIZATION_TEMPLATE,
-        "creative_writing": CREATIVE_WRITING_TEMPLATE,
-        "comparison": COMPARISON_TEMPLATE,
-        "code_generation": CODE_GENERATION_TEMPLATE,
-        "qa": QA_TEMPLATE,
-    }
-    
-    return templates.get(template_name.lower())
+    return TEMPLATES.get(template_name.lower())
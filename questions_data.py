@@ -0,0 +1,52 @@
+"""
+questions_data.py - Kinyarwanda questions and topic categories shared by the evaluation scripts
+"""
+
+import os
+import re
+from pathlib import Path
+from types import MappingProxyType
+
+QUESTIONS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "kinyarwanda_questions.txt")
+
+# The questions, one per line in the data file
+KINYARWANDA_QUESTIONS = tuple(Path(QUESTIONS_FILE).read_text(encoding="utf-8").splitlines())
+
+# Lowercased once for keyword matching
+LOWERED_QUESTIONS = tuple(question.lower() for question in KINYARWANDA_QUESTIONS)
+
+# Keyword -> topic category; earlier keywords win when a question matches several
+TOPIC_CATEGORIES = MappingProxyType({
+    "irembo": "Irembo Services",
+    "akazi": "Employment",
+    "ubutaka": "Land Registration",
+    "pasiporo": "Passport Services",
+    "permit": "Permits and Licenses",
+    "examen": "Examinations",
+    "kizami": "Examinations",
+    "indangamuntu": "National ID",
+    "icyemezo": "Certificates",
+    "amavuko": "Birth Certificate",
+    "ishyingirwa": "Marriage Registration",
+    "imisoro": "Taxes",
+    "amafoto": "Documentation",
+    "Traffic fine": "Traffic Fines",
+    "ntafunzwe": "Criminal Record Certificate",
+    "machine": "Technical Issues",
+    "amanota": "Examinations"
+})
+
+# Lowercased keyword -> (priority, category), precompiled into a single alternation in priority order;
+# the lookahead matches at every position, so overlapping keywords are all found
+TOPIC_KEYWORDS = {keyword.lower(): (i, category) for i, (keyword, category) in enumerate(TOPIC_CATEGORIES.items())}
+TOPIC_PATTERN = re.compile("(?=(" + "|".join(re.escape(keyword) for keyword in TOPIC_KEYWORDS) + "))")
+
+def detect_topic_category(question, already_lowered=False):
+    """Detect the topic category based on keywords in the question (pass already_lowered for a lowercased question)."""
+    if not already_lowered:
+        question = question.lower()
+    
+    # One scan finds every keyword; the earliest-listed keyword still decides the category
+    matches = [TOPIC_KEYWORDS[match.group(1)] for match in TOPIC_PATTERN.finditer(question)]
+    
+    return min(matches)[1] if matches else "Other"
@@ -1,10 +1,17 @@
 \
 import os
+import json
+import asyncio
+import argparse
 import pandas as pd
 from dotenv import load_dotenv
 from google.cloud import translate_v2 as translate
-from openai import OpenAI
-import time # Import time for potential rate limiting delays
+from google.api_core import exceptions as google_exceptions
+import requests
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+from openai import AsyncOpenAI
+from batch_backend import submit_openai_batch
+import llm_cache
 
 # --- Configuration ---
 INPUT_CSV_PATH = "data/google-analytics-qna.csv"
@@ -12,77 +19,289 @@ OUTPUT_CSV_PATH = "data/google-analytics-qna.csv" # Overwrite the input file
 SOURCE_LANGUAGE = "rw" # Kinyarwanda ISO 639-1 code
 TARGET_LANGUAGE_ENGLISH = "en"
 TARGET_LANGUAGE_KINYARWANDA = "rw"
-OPENAI_MODEL = "gpt-3.5-turbo" # Or choose another model like gpt-4o if preferred
+OPENAI_MODEL = "gpt-4o-mini" # Or choose another model like gpt-4o if preferred
+ANSWER_MAX_TOKENS = 90 # A 1-3 sentence answer fits well within this; a lower cap keeps completions short
+ANSWER_STOP = ["\n\n"] # Stop at the first paragraph break rather than running on
 QUESTION_COLUMN = "Question" # Assuming this is the header in your CSV
 ANSWER_COLUMN = "Answer"
+MAX_CONCURRENCY = 16 # API calls in flight at once; lower this if providers start rate limiting
+TRANSLATE_BATCH_SIZE = 100 # Texts sent per Google Translate request
+ANSWER_BATCH_SIZE = 8 # Questions answered per OpenAI request
+RETRY_ATTEMPTS = 4 # Attempts per Google Translate request for rate limits, server errors and timeouts
+
+# --- Prompts ---
+# Instructions shared by every answer request; the user message carries only the question
+SYSTEM_MSG = {
+    "role": "system",
+    "content": (
+        "You are an assistant providing information about Irembo services in Rwanda. "
+        "Answer questions concisely and helpfully in English (1-3 sentences each)."
+    )
+}
+USER_TEMPLATE = "Question: {q}\nAnswer:"
+BATCH_USER_TEMPLATE = (
+    "Answer each of the following numbered questions. "
+    'Respond with a JSON object of the form {{"answers": ["...", "..."]}} holding one answer per question, in order.\n'
+    "Questions:\n{questions}"
+)
 
 # --- Load Environment Variables ---
 load_dotenv()
-openai_api_key = os.getenv("OPENAI_API_KEY")
 # GOOGLE_APPLICATION_CREDENTIALS is automatically used by the library
 # if the environment variable is set.
 
-if not openai_api_key:
-    raise ValueError("OPENAI_API_KEY not found in .env file.")
-# No explicit check for GOOGLE_APPLICATION_CREDENTIALS needed here,
-# the library handles it. If it's not set or invalid, an error will occur later.
+api_semaphore = asyncio.Semaphore(MAX_CONCURRENCY) # Shared by every outbound call
 
-# --- Initialize Clients ---
-translate_client = translate.Client()
-openai_client = OpenAI(api_key=openai_api_key)
+# --- Errors ---
+# Stages keep going past individual failures, so a failed item holds its error in place of a string
+class TranslationError(Exception):
+    """A Google Cloud translation request failed."""
+
+class OpenAIError(Exception):
+    """An OpenAI answer request failed."""
+
+# --- Startup Checks ---
+# Run before any client is created, so a misconfigured run fails without opening connections
+def validate_config() -> None:
+    """Checks the environment variables the clients need."""
+    if not os.getenv("OPENAI_API_KEY"):
+        raise ValueError("OPENAI_API_KEY not found in .env file.")
+    # No explicit check for GOOGLE_APPLICATION_CREDENTIALS needed here,
+    # the library handles it. If it's not set or invalid, an error will occur later.
+
+def validate_input(path: str) -> pd.DataFrame:
+    """Reads only the question column from the input CSV, raising ValueError if it is missing."""
+    # Arrow-backed strings keep the column in one buffer instead of a Python object per cell
+    df = pd.read_csv(path, usecols=lambda column: column == QUESTION_COLUMN, dtype={QUESTION_COLUMN: 'string[pyarrow]'}, keep_default_na=False) # Avoid interpreting 'NA' as NaN
+    if QUESTION_COLUMN not in df.columns:
+        raise ValueError(f"Column '{QUESTION_COLUMN}' not found in {path}")
+    return df
 
 # --- Helper Functions ---
-def translate_text(text: str, target_language: str, source_language: str = None) -> str:
-    """Translates text using Google Cloud Translation API."""
-    if not text or pd.isna(text):
-        return "" # Handle empty or NaN inputs
-    try:
-        result = translate_client.translate(
-            text,
+def is_retryable(exception: BaseException) -> bool:
+    """Retries rate limits (429), server errors (5xx), timeouts and dropped connections; other 4xx errors fail fast."""
+    return isinstance(exception, (
+        google_exceptions.TooManyRequests,
+        google_exceptions.ServerError,
+        requests.exceptions.ConnectionError,
+        requests.exceptions.Timeout
+    ))
+
+# Exponential backoff with jitter; the last error is re-raised once attempts run out
+api_retry = retry(
+    retry=retry_if_exception(is_retryable),
+    wait=wait_exponential_jitter(1, 30),
+    stop=stop_after_attempt(RETRY_ATTEMPTS),
+    reraise=True
+)
+
+@api_retry
+async def translate_request(values: list, target_language: str, source_language: str = None) -> list:
+    """Translates a list of texts in a single Google Translate request."""
+    # The client is blocking, so run it in a worker thread to overlap requests
+    async with api_semaphore:
+        return await asyncio.to_thread(
+            translate_client.translate,
+            values,
             target_language=target_language,
             source_language=source_language # Optional, let Google detect if None
         )
-        # Add a small delay to potentially avoid hitting rate limits
-        # time.sleep(0.1)
-        return result['translatedText']
-    except Exception as e:
-        print(f"Error translating '{text}': {e}")
-        return f"[Translation Error: {e}]"
 
-def get_openai_answer(question_en: str) -> str:
-    """Gets an answer from OpenAI based on the English question."""
+async def translate_texts(texts: list, target_language: str, source_language: str = None) -> list:
+    """Translates a list of texts using Google Cloud Translation API, one request per chunk; failed texts become TranslationError."""
+    translations = [""] * len(texts) # Empty or NaN inputs stay empty
+    cache_keys = {}
+    pending = []
+    for i, text in enumerate(texts):
+        if not text or pd.isna(text):
+            continue
+        # Earlier translations are reused from the on-disk cache
+        cache_keys[i] = llm_cache.make_key("google-cloud-translate", source_language, target_language, text)
+        cached = llm_cache.get(cache_keys[i])
+        if cached is not None:
+            translations[i] = cached
+        else:
+            pending.append(i)
+    chunks = [pending[start:start + TRANSLATE_BATCH_SIZE] for start in range(0, len(pending), TRANSLATE_BATCH_SIZE)]
+
+    async def translate_chunk(chunk: list) -> None:
+        try:
+            results = await translate_request([texts[i] for i in chunk], target_language, source_language)
+        except google_exceptions.BadRequest as e:
+            if len(chunk) == 1:
+                print(f"Error translating '{texts[chunk[0]][:30]}...': {e}")
+                translations[chunk[0]] = TranslationError(str(e))
+                return
+            # Split a rejected chunk so one bad text doesn't fail the rest of it
+            half = len(chunk) // 2
+            await asyncio.gather(translate_chunk(chunk[:half]), translate_chunk(chunk[half:]))
+            return
+        except Exception as e:
+            print(f"Error translating {len(chunk)} texts: {e}")
+            error = TranslationError(str(e))
+            for i in chunk:
+                translations[i] = error
+            return
+
+        for i, result in zip(chunk, results):
+            translations[i] = result['translatedText']
+            llm_cache.set(cache_keys[i], translations[i])
+
+    await asyncio.gather(*(translate_chunk(chunk) for chunk in chunks))
+    return translations
+
+def answer_cache_key(question_en: str) -> str:
+    """Cache key for the OpenAI answer to an English question."""
+    return llm_cache.make_key(OPENAI_MODEL, "answer", question_en)
+
+def cached_answers(questions_en: list) -> tuple:
+    """Returns (answers, pending): answers filled from the on-disk cache, and the indexes still to answer."""
+    answers = [""] * len(questions_en) # Empty or untranslated questions get no answer
+    pending = []
+    for i, question_en in enumerate(questions_en):
+        if not question_en or isinstance(question_en, TranslationError):
+            continue
+        cached = llm_cache.get(answer_cache_key(question_en))
+        if cached is not None:
+            answers[i] = cached
+        else:
+            pending.append(i)
+    return answers, pending
+
+def store_answer(question_en: str, answer_en) -> None:
+    """Caches a successful answer so reruns don't pay for it again."""
+    if not isinstance(answer_en, OpenAIError):
+        llm_cache.set(answer_cache_key(question_en), answer_en)
+
+async def get_openai_answer(question_en: str) -> str:
+    """Gets an answer from OpenAI based on the English question, raising OpenAIError on failure."""
     if not question_en:
         return "" # Handle empty input
     try:
-        prompt = f"""
-        You are an assistant providing information about Irembo services in Rwanda.
-        Answer the following question concisely and helpfully in English (1-3 sentences).
-        Question: {question_en}
-        Answer:
-        """
-        response = openai_client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": "You are an assistant for Irembo services."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.5, # Adjust for creativity vs consistency
-            max_tokens=100
-        )
-        # Add a small delay
-        # time.sleep(0.1)
+        async with api_semaphore:
+            response = await openai_client.chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=[SYSTEM_MSG, {"role": "user", "content": USER_TEMPLATE.format(q=question_en)}],
+                temperature=0.5, # Adjust for creativity vs consistency
+                max_tokens=ANSWER_MAX_TOKENS,
+                stop=ANSWER_STOP
+            )
         return response.choices[0].message.content.strip()
     except Exception as e:
         print(f"Error getting OpenAI answer for '{question_en}': {e}")
-        return f"[OpenAI Error: {e}]"
+        raise OpenAIError(str(e)) from e
+
+async def get_openai_answers_batch(questions_en: list) -> list:
+    """Gets answers for several English questions from one OpenAI request, in question order; failed answers become OpenAIError."""
+    numbered_questions = "\n".join(f"{n}) {question_en}" for n, question_en in enumerate(questions_en, start=1))
+    try:
+        async with api_semaphore:
+            response = await openai_client.chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=[SYSTEM_MSG, {"role": "user", "content": BATCH_USER_TEMPLATE.format(questions=numbered_questions)}],
+                temperature=0.5,
+                max_tokens=ANSWER_MAX_TOKENS * len(questions_en), # Same budget per answer as a single call
+                response_format={"type": "json_object"}
+            )
+        answers = json.loads(response.choices[0].message.content)["answers"]
+        if isinstance(answers, list) and len(answers) == len(questions_en):
+            return [str(answer).strip() for answer in answers]
+        print(f"Expected {len(questions_en)} answers from OpenAI, got {len(answers)}")
+    except Exception as e:
+        print(f"Error getting batched OpenAI answers for {len(questions_en)} questions: {e}")
+
+    # Fall back to one call per question when the batch can't be used
+    return await asyncio.gather(*(get_openai_answer(question_en) for question_en in questions_en), return_exceptions=True)
+
+async def answer_questions(questions_en: list) -> list:
+    """Gets English answers for a list of questions, ANSWER_BATCH_SIZE questions per OpenAI request."""
+    answers, pending = cached_answers(questions_en)
+    chunks = [pending[start:start + ANSWER_BATCH_SIZE] for start in range(0, len(pending), ANSWER_BATCH_SIZE)]
+
+    batches = await asyncio.gather(*(get_openai_answers_batch([questions_en[i] for i in chunk]) for chunk in chunks))
+    for chunk, batch in zip(chunks, batches):
+        for i, answer in zip(chunk, batch):
+            answers[i] = answer
+            store_answer(questions_en[i], answer)
+    return answers
+
+async def answer_questions_with_batch_api(questions_en: list) -> list:
+    """Gets English answers through the OpenAI Batch API: about half the cost, but results can take up to 24 hours."""
+    answers, pending = cached_answers(questions_en)
+    batch_requests = {f"row-{i}": USER_TEMPLATE.format(q=questions_en[i]) for i in pending}
+    if not batch_requests:
+        return answers
+
+    try:
+        # The submitter blocks while it polls the batch, so keep it off the event loop
+        results = await asyncio.to_thread(
+            submit_openai_batch,
+            batch_requests,
+            OPENAI_MODEL,
+            temperature=0.5,
+            system=SYSTEM_MSG["content"],
+            max_tokens=ANSWER_MAX_TOKENS,
+            stop=ANSWER_STOP
+        )
+    except Exception as e:
+        print(f"Error running OpenAI batch: {e}")
+        results = {custom_id: f"Error: {e}" for custom_id in batch_requests}
+
+    for custom_id, content in results.items():
+        i = int(custom_id.split("-")[1])
+        answers[i] = OpenAIError(content[len("Error: "):]) if content.startswith("Error: ") else content.strip()
+        store_answer(questions_en[i], answers[i])
+    return answers
+
+async def main(questions_rw: list, use_batch_api: bool = False) -> list:
+    """Runs the three stages over all questions at once and returns the answers in input order."""
+
+    # 1. Translate Kinyarwanda Questions -> English
+    print("  Translating questions to English...")
+    questions_en = await translate_texts(questions_rw, TARGET_LANGUAGE_ENGLISH, SOURCE_LANGUAGE)
+
+    # 2. Get English Answers from OpenAI (rows whose translation failed are skipped)
+    print("  Getting English answers from OpenAI...")
+    if use_batch_api:
+        answers_en = await answer_questions_with_batch_api(questions_en)
+    else:
+        answers_en = await answer_questions(questions_en)
+
+    # 3. Translate English Answers -> Kinyarwanda
+    print("  Translating answers back to Kinyarwanda...")
+    answers_rw = await translate_texts(
+        ["" if isinstance(answer_en, OpenAIError) else answer_en for answer_en in answers_en],
+        TARGET_LANGUAGE_KINYARWANDA,
+        TARGET_LANGUAGE_ENGLISH
+    )
+
+    answers = []
+    failed = 0
+    for question_en, answer_en, answer_rw in zip(questions_en, answers_en, answers_rw):
+        if isinstance(question_en, TranslationError) or isinstance(answer_en, OpenAIError):
+            answers.append('[Processing Error]')
+            failed += 1
+        elif isinstance(answer_rw, TranslationError):
+            # Store the English answer or an error message? Storing error for now.
+            answers.append('[Answer Translation Error]')
+            failed += 1
+        else:
+            answers.append(answer_rw)
+
+    if failed:
+        print(f"  Warning: {failed} question(s) could not be processed.")
+    return answers
 
 # --- Main Script ---
+parser = argparse.ArgumentParser(description="Answer Kinyarwanda questions via Google Translate and OpenAI")
+parser.add_argument("--use-batch-api", action="store_true", help="Answer through the OpenAI Batch API (about half the cost, results can take up to 24 hours)")
+args = parser.parse_args()
+
+validate_config()
+
 print(f"Loading questions from {INPUT_CSV_PATH}...")
 try:
-    df = pd.read_csv(INPUT_CSV_PATH, keep_default_na=False) # Avoid interpreting 'NA' as NaN
-    if QUESTION_COLUMN not in df.columns:
-         raise ValueError(f"Column '{QUESTION_COLUMN}' not found in {INPUT_CSV_PATH}")
-
+    df = validate_input(INPUT_CSV_PATH)
 except FileNotFoundError:
     print(f"Error: Input file not found at {INPUT_CSV_PATH}")
     exit(1)
@@ -93,49 +312,26 @@ except Exception as e:
     print(f"Error reading CSV {INPUT_CSV_PATH}: {e}")
     exit(1)
 
+# --- Initialize Clients ---
+translate_client = translate.Client()
+openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-print(f"Processing {len(df)} questions...")
-
-results = []
-for index, row in df.iterrows():
-    question_rw = row[QUESTION_COLUMN]
-    print(f"  Processing question {index + 1}/{len(df)}: '{question_rw[:50]}...'")
-
-    # 1. Translate Kinyarwanda Question -> English
-    print("    Translating to English...")
-    question_en = translate_text(question_rw, TARGET_LANGUAGE_ENGLISH, SOURCE_LANGUAGE)
-    if "[Translation Error:" in question_en:
-         print(f"    Skipping due to translation error.")
-         results.append({'Question': question_rw, 'Answer': '[Processing Error]'})
-         continue # Skip to next question if translation failed
-
-    # 2. Get English Answer from OpenAI
-    print("    Getting English answer from OpenAI...")
-    answer_en = get_openai_answer(question_en)
-    if "[OpenAI Error:" in answer_en:
-        print(f"    Skipping due to OpenAI error.")
-        results.append({'Question': question_rw, 'Answer': '[Processing Error]'})
-        continue # Skip to next question if OpenAI failed
-
-    # 3. Translate English Answer -> Kinyarwanda
-    print("    Translating answer back to Kinyarwanda...")
-    answer_rw = translate_text(answer_en, TARGET_LANGUAGE_KINYARWANDA, TARGET_LANGUAGE_ENGLISH)
-    if "[Translation Error:" in answer_rw:
-         print(f"    Warning: Failed to translate answer back to Kinyarwanda.")
-         # Store the English answer or an error message? Storing error for now.
-         results.append({'Question': question_rw, 'Answer': '[Answer Translation Error]'})
-         continue
-
-
-    results.append({'Question': question_rw, 'Answer': answer_rw})
-    print("    Done.")
+# Repeated questions are translated and answered once, then mapped back onto every row
+questions_out = df[QUESTION_COLUMN].to_numpy()
+unique_questions = df[QUESTION_COLUMN].drop_duplicates().tolist()
+print(f"Processing {len(unique_questions)} unique questions ({len(df)} rows)...")
+answer_map = dict(zip(unique_questions, asyncio.run(main(unique_questions, use_batch_api=args.use_batch_api))))
+answers_out = df[QUESTION_COLUMN].map(answer_map).to_numpy()
 
 
 # --- Save Results ---
 print(f"\nSaving results to {OUTPUT_CSV_PATH}...")
-output_df = pd.DataFrame(results)
+output_df = pd.DataFrame({'Question': questions_out, 'Answer': answers_out})
 
-# Ensure columns are correctly quoted for CSV standard
-output_df.to_csv(OUTPUT_CSV_PATH, index=False, quoting=1) # quoting=1 corresponds to csv.QUOTE_ALL
+# Ensure columns are correctly quoted for CSV standard; write to a temporary file and swap it in
+# so an interrupted save never destroys the input
+tmp_path = OUTPUT_CSV_PATH + ".tmp"
+output_df.to_csv(tmp_path, index=False, quoting=1) # quoting=1 corresponds to csv.QUOTE_ALL
+os.replace(tmp_path, OUTPUT_CSV_PATH)
 
 print("Script finished successfully!")
@@ -1,17 +1,25 @@
 import os
+import csv
+import asyncio
+from functools import partial
 import pandas as pd
 from dotenv import load_dotenv
-import requests
-from openai import OpenAI
-import time
-import json
+import httpx
+import openai
+from openai import AsyncOpenAI
+from aiolimiter import AsyncLimiter
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+import orjson
+import llm_cache
 
 # --- Configuration ---
 CSV_FILE_PATH = "data/digital-umuganda-mt-qna.csv"
 SOURCE_LANGUAGE = "rw"
 TARGET_LANGUAGE_ENGLISH = "en"
 TARGET_LANGUAGE_KINYARWANDA = "rw"
-OPENAI_MODEL = "gpt-3.5-turbo"
+OPENAI_MODEL = "gpt-4o-mini"
+ANSWER_MAX_TOKENS = 90 # A 1-3 sentence answer fits well within this; a lower cap keeps completions short
+ANSWER_STOP = ["\n\n"] # Stop at the first paragraph break rather than running on
 QUESTION_COLUMN = "Question" # Make sure this matches the header in your CSV
 ANSWER_COLUMN = "Answer"
 RAPIDAPI_ENDPOINT = "https://du_mt_api.p.rapidapi.com/api/v1/translate"
@@ -19,23 +27,93 @@ RAPIDAPI_ENDPOINT = "https://du_mt_api.p.rapidapi.com/api/v1/translate"
 MODEL_RW_EN = "MULTI-rw-en"
 MODEL_EN_RW = "MULTI-en-rw"
 REQUEST_TIMEOUT = 30 # Timeout for API requests in seconds
+MAX_CONNECTIONS = 32 # Pooled RapidAPI connections, reused across all rows
+MAX_CONCURRENCY = 8 # API calls in flight at once
+RAPIDAPI_MAX_RATE = 5 # RapidAPI requests per second allowed by the plan
+OPENAI_MAX_RATE = 5 # OpenAI requests per second
+RETRY_ATTEMPTS = 4 # Attempts per API call for rate limits, server errors and timeouts
+QUEUE_SIZE = 64 # Rows buffered between pipeline stages
+TRANSLATE_WORKERS = 8 # Workers per translation stage
+ANSWER_WORKERS = 4 # Workers for the OpenAI stage
+
+# --- Prompts ---
+# Instructions shared by every answer request; the user message carries only the question
+SYSTEM_MSG = {
+    "role": "system",
+    "content": (
+        "You are an assistant providing information about Irembo services in Rwanda. "
+        "Answer questions concisely and helpfully in English (1-3 sentences each)."
+    )
+}
+USER_TEMPLATE = "Question: {q}\nAnswer:"
 
 # --- Load Environment Variables ---
 load_dotenv()
-openai_api_key = os.getenv("OPENAI_API_KEY")
-rapidapi_key = os.getenv("RAPID_API_KEY") # Note: Key name changed in .env
 
-if not openai_api_key:
-    raise ValueError("OPENAI_API_KEY not found in .env file.")
-if not rapidapi_key:
-    raise ValueError("RAPID_API_KEY not found in .env file.")
+api_semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+# Token buckets bound requests per second independently of how many are in flight
+rapidapi_limiter = AsyncLimiter(RAPIDAPI_MAX_RATE, 1.0)
+openai_limiter = AsyncLimiter(OPENAI_MAX_RATE, 1.0)
 
-# --- Initialize Clients ---
-openai_client = OpenAI(api_key=openai_api_key)
+# --- Startup Checks ---
+# Run before any client is created, so a misconfigured run fails without opening connections
+def validate_config() -> None:
+    """Checks the API keys the clients need."""
+    if not os.getenv("OPENAI_API_KEY"):
+        raise ValueError("OPENAI_API_KEY not found in .env file.")
+    if not os.getenv("RAPID_API_KEY"): # Note: Key name changed in .env
+        raise ValueError("RAPID_API_KEY not found in .env file.")
+
+def validate_input(path: str) -> pd.DataFrame:
+    """Reads only the question column from the input CSV, raising ValueError if it is missing."""
+    # Arrow-backed strings keep the column in one buffer instead of a Python object per cell
+    # Specify encoding, as default might not work for Kinyarwanda characters
+    df = pd.read_csv(path, usecols=lambda column: column == QUESTION_COLUMN, dtype={QUESTION_COLUMN: 'string[pyarrow]'}, keep_default_na=False, encoding='utf-8')
+    if QUESTION_COLUMN not in df.columns:
+        raise ValueError(f"Column '{QUESTION_COLUMN}' not found in {path}")
+    return df
+
+# --- Errors ---
+class TranslationError(Exception):
+    """A translation leg failed; the message says why."""
+
+class OpenAIError(Exception):
+    """The OpenAI answer leg failed; the message says why."""
 
 # --- Helper Functions ---
-def translate_digital_umuganda(text: str, src_lang: str, tgt_lang: str) -> str:
-    """Translates text using the Digital Umuganda MT API via RapidAPI."""
+def is_retryable(exception: BaseException) -> bool:
+    """Retries rate limits (429), server errors (5xx), timeouts and dropped connections; other 4xx errors fail fast."""
+    if isinstance(exception, (httpx.TimeoutException, httpx.NetworkError, asyncio.TimeoutError, openai.APIConnectionError)):
+        return True
+    status = getattr(getattr(exception, "response", None), "status_code", None)
+    return status == 429 or (status is not None and status >= 500)
+
+# Exponential backoff with jitter; the last error is re-raised once attempts run out
+api_retry = retry(
+    retry=retry_if_exception(is_retryable),
+    wait=wait_exponential_jitter(1, 30),
+    stop=stop_after_attempt(RETRY_ATTEMPTS),
+    reraise=True
+)
+
+@api_retry
+async def post_translation(payload: dict) -> httpx.Response:
+    """Posts one translation request to RapidAPI within the rate limit."""
+    async with rapidapi_limiter:
+        async with api_semaphore:
+            response = await rapidapi_client.post(RAPIDAPI_ENDPOINT, json=payload)
+    response.raise_for_status() # Raise an exception for bad status codes (4xx or 5xx)
+    return response
+
+@api_retry
+async def create_chat_completion(**kwargs):
+    """Creates one OpenAI chat completion within the rate limit."""
+    async with openai_limiter:
+        async with api_semaphore:
+            return await openai_client.chat.completions.create(**kwargs)
+
+async def translate_digital_umuganda(text: str, src_lang: str, tgt_lang: str) -> str:
+    """Translates text using the Digital Umuganda MT API via RapidAPI, raising TranslationError on failure."""
     if not text or pd.isna(text):
         return ""
 
@@ -44,8 +122,13 @@ def translate_digital_umuganda(text: str, src_lang: str, tgt_lang: str) -> str:
     elif src_lang == "en" and tgt_lang == "rw":
         model = MODEL_EN_RW
     else:
-        print(f"Error: Unsupported language pair: {src_lang} -> {tgt_lang}")
-        return "[Unsupported Language Pair]"
+        raise TranslationError(f"Unsupported language pair: {src_lang} -> {tgt_lang}")
+
+    # Earlier translations are reused from the on-disk cache
+    cache_key = llm_cache.make_key("digital-umuganda", model, text)
+    cached = llm_cache.get(cache_key)
+    if cached is not None:
+        return cached
 
     payload = {
         "src": src_lang,
@@ -53,74 +136,126 @@ def translate_digital_umuganda(text: str, src_lang: str, tgt_lang: str) -> str:
         "use_multi": model,
         "text": text
     }
-    headers = {
-        "content-type": "application/json",
-        "X-RapidAPI-Key": rapidapi_key,
-        "X-RapidAPI-Host": "du_mt_api.p.rapidapi.com"
-    }
+    try:
+        response = await post_translation(payload)
+    except httpx.HTTPStatusError as e:
+        # The body was read once with the response; decode it as JSON when the API sent JSON
+        body = e.response.content
+        try:
+            error_detail = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            error_detail = body.decode("utf-8", errors="replace") # Use raw text if not JSON
+        raise TranslationError(f"RapidAPI request failed with status {e.response.status_code}: {error_detail}") from e
+    except httpx.HTTPError as e:
+        raise TranslationError(f"RapidAPI request failed: {e}") from e
 
     try:
-        response = requests.post(RAPIDAPI_ENDPOINT, json=payload, headers=headers, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status() # Raise an exception for bad status codes (4xx or 5xx)
-
-        response_data = response.json()
-        if "translation" in response_data:
-            # Add a small delay
-            # time.sleep(0.2) # Slightly longer delay might be needed for rate limits
-            return response_data["translation"]
-        else:
-            print(f"Error: Unexpected response format from RapidAPI: {response_data}")
-            return "[Translation API Response Format Error]"
-
-    except requests.exceptions.RequestException as e:
-        print(f"Error translating '{text[:30]}...' with RapidAPI: {e}")
-        # Check if response exists and has content before trying to parse JSON
-        error_detail = "Unknown error"
-        if e.response is not None:
-            try:
-                error_detail = e.response.json()
-            except json.JSONDecodeError:
-                error_detail = e.response.text # Use raw text if not JSON
-        return f"[Translation API Request Error: {error_detail}]"
-    except Exception as e:
-        print(f"Unexpected error during translation: {e}")
-        return "[Unexpected Translation Error]"
+        response_data = orjson.loads(response.content)
+    except orjson.JSONDecodeError as e:
+        raise TranslationError(f"RapidAPI returned invalid JSON: {e}") from e
 
-def get_openai_answer(question_en: str) -> str:
-    """Gets an answer from OpenAI based on the English question."""
+    if "translation" not in response_data:
+        raise TranslationError(f"Unexpected response format from RapidAPI: {response_data}")
+    llm_cache.set(cache_key, response_data["translation"])
+    return response_data["translation"]
+
+async def get_openai_answer(question_en: str) -> str:
+    """Gets an answer from OpenAI based on the English question, raising OpenAIError on failure."""
     if not question_en:
         return ""
+
+    # Earlier answers are reused from the on-disk cache
+    cache_key = llm_cache.make_key(OPENAI_MODEL, "answer", question_en)
+    cached = llm_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
-        prompt = f"""
-        You are an assistant providing information about Irembo services in Rwanda.
-        Answer the following question concisely and helpfully in English (1-3 sentences).
-        Question: {question_en}
-        Answer:
-        """
-        response = openai_client.chat.completions.create(
+        response = await create_chat_completion(
             model=OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": "You are an assistant for Irembo services."},
-                {"role": "user", "content": prompt}
-            ],
+            messages=[SYSTEM_MSG, {"role": "user", "content": USER_TEMPLATE.format(q=question_en)}],
             temperature=0.5,
-            max_tokens=100
+            max_tokens=ANSWER_MAX_TOKENS,
+            stop=ANSWER_STOP
         )
-        # Add a small delay
-        # time.sleep(0.1)
-        return response.choices[0].message.content.strip()
+        answer = response.choices[0].message.content.strip()
     except Exception as e:
-        print(f"Error getting OpenAI answer for '{question_en[:30]}...': {e}")
-        return f"[OpenAI Error: {e}]"
+        raise OpenAIError(str(e)) from e
+    llm_cache.set(cache_key, answer)
+    return answer
+
+# --- Pipeline ---
+# Rows flow rw_questions -> en_questions -> en_answers -> results as (index, text) pairs,
+# so one row's back-translation overlaps with later rows' first translation
+async def feed(questions: list, q_out: asyncio.Queue, workers: int) -> None:
+    """Queues every question, then one None sentinel per first-stage worker."""
+    for index, question_rw in enumerate(questions):
+        await q_out.put((index, question_rw))
+    for _ in range(workers):
+        await q_out.put(None)
+
+async def stage_worker(step: str, label: str, call, q_in: asyncio.Queue, q_out: asyncio.Queue, results: asyncio.Queue) -> None:
+    """Runs one leg on each row until the None sentinel arrives; failed rows go straight to results as error markers."""
+    while (item := await q_in.get()) is not None:
+        index, text = item
+        try:
+            result = await call(text)
+        except (TranslationError, OpenAIError) as e:
+            print(f"    [{index + 1}] {step} failed: {e}")
+            await results.put((index, f'[Processing Error: {step} Failed]'))
+            continue
+        print(f"      [{index + 1}] {label}: {result[:60]}...")
+        await q_out.put((index, result))
+
+async def run_stage(step: str, label: str, call, workers: int, q_in: asyncio.Queue, q_out: asyncio.Queue, results: asyncio.Queue, next_workers: int) -> None:
+    """Runs a pool of workers for one leg, then passes one sentinel per downstream worker once they have all stopped."""
+    await asyncio.gather(*(stage_worker(step, label, call, q_in, q_out, results) for _ in range(workers)))
+    for _ in range(next_workers):
+        await q_out.put(None)
+
+async def main(questions: list, rows: list, writer, out_file) -> None:
+    """Streams every question through the three legs, writing rows in input order as soon as their answers are in."""
+    rw_questions = asyncio.Queue(maxsize=QUEUE_SIZE)
+    en_questions = asyncio.Queue(maxsize=QUEUE_SIZE)
+    en_answers = asyncio.Queue(maxsize=QUEUE_SIZE)
+    results = asyncio.Queue() # Unbounded, so error rows from any stage never wait on the writer
+    print(f"Running {len(questions)} questions through the RW->EN, OpenAI and EN->RW stages...")
+
+    pipeline = asyncio.gather(
+        feed(questions, rw_questions, TRANSLATE_WORKERS),
+        run_stage("RW->EN Translation", "English Question", partial(translate_digital_umuganda, src_lang=SOURCE_LANGUAGE, tgt_lang=TARGET_LANGUAGE_ENGLISH),
+                  TRANSLATE_WORKERS, rw_questions, en_questions, results, ANSWER_WORKERS),
+        run_stage("OpenAI", "English Answer", get_openai_answer,
+                  ANSWER_WORKERS, en_questions, en_answers, results, TRANSLATE_WORKERS),
+        run_stage("EN->RW Translation", "Kinyarwanda Answer", partial(translate_digital_umuganda, src_lang=TARGET_LANGUAGE_ENGLISH, tgt_lang=TARGET_LANGUAGE_KINYARWANDA),
+                  TRANSLATE_WORKERS, en_answers, results, results, 0)
+    )
+    # Every result is queued before the pipeline finishes, so this sentinel always comes last (also if a stage crashes)
+    pipeline.add_done_callback(lambda _: results.put_nowait(None))
+
+    answers = {}
+    next_row = 0
+    try:
+        while (item := await results.get()) is not None:
+            index, answer_rw = item
+            answers[questions[index]] = answer_rw
+
+            # Write every row that is now ready and make it durable, so a crash keeps the progress so far
+            while next_row < len(rows) and rows[next_row] in answers:
+                writer.writerow([rows[next_row], answers[rows[next_row]]])
+                next_row += 1
+            out_file.flush()
+            os.fsync(out_file.fileno())
+        await pipeline # Re-raise anything that stopped a stage early
+    finally:
+        await rapidapi_client.aclose()
 
 # --- Main Script ---
+validate_config()
+
 print(f"Loading questions from {CSV_FILE_PATH}...")
 try:
-    # Specify encoding, as default might not work for Kinyarwanda characters
-    df = pd.read_csv(CSV_FILE_PATH, keep_default_na=False, encoding='utf-8')
-    if QUESTION_COLUMN not in df.columns:
-         raise ValueError(f"Column '{QUESTION_COLUMN}' not found in {CSV_FILE_PATH}")
-
+    df = validate_input(CSV_FILE_PATH)
 except FileNotFoundError:
     print(f"Error: File not found at {CSV_FILE_PATH}")
     exit(1)
@@ -131,50 +266,35 @@ except Exception as e:
     print(f"Error reading CSV {CSV_FILE_PATH}: {e}")
     exit(1)
 
-print(f"Processing {len(df)} questions...")
-
-results = []
-for index, row in df.iterrows():
-    question_rw = row[QUESTION_COLUMN]
-    print(f"\nProcessing question {index + 1}/{len(df)}: '{question_rw[:50]}...'")
-
-    # --- Step 1: Translate Kinyarwanda Question -> English ---
-    print("    Translating RW -> EN using Digital Umuganda API...")
-    question_en = translate_digital_umuganda(question_rw, SOURCE_LANGUAGE, TARGET_LANGUAGE_ENGLISH)
-    if "[Translation" in question_en or "[Unsupported" in question_en:
-         print(f"    Skipping due to RW->EN translation error: {question_en}")
-         results.append({'Question': question_rw, 'Answer': '[Processing Error: RW->EN Translation Failed]'})
-         continue
-    print(f"      English Question: {question_en[:60]}...")
-
-    # --- Step 2: Get English Answer from OpenAI ---
-    print("    Getting English answer from OpenAI...")
-    answer_en = get_openai_answer(question_en)
-    if "[OpenAI Error:" in answer_en:
-        print(f"    Skipping due to OpenAI error: {answer_en}")
-        results.append({'Question': question_rw, 'Answer': '[Processing Error: OpenAI Failed]'})
-        continue
-    print(f"      English Answer: {answer_en[:60]}...")
-
-    # --- Step 3: Translate English Answer -> Kinyarwanda ---
-    print("    Translating EN -> RW using Digital Umuganda API...")
-    answer_rw = translate_digital_umuganda(answer_en, TARGET_LANGUAGE_ENGLISH, TARGET_LANGUAGE_KINYARWANDA)
-    if "[Translation" in answer_rw or "[Unsupported" in answer_rw:
-         print(f"    Warning: Failed to translate answer EN->RW: {answer_rw}")
-         results.append({'Question': question_rw, 'Answer': '[Processing Error: EN->RW Translation Failed]'})
-         continue
-    print(f"      Kinyarwanda Answer: {answer_rw[:60]}...")
-
-
-    results.append({'Question': question_rw, 'Answer': answer_rw})
-    print("    Done.")
+# --- Initialize Clients ---
+openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0) # Retries are handled by api_retry
+# One pooled HTTP/2 client for every RapidAPI call; the headers are the same on each request
+rapidapi_client = httpx.AsyncClient(
+    http2=True,
+    timeout=REQUEST_TIMEOUT,
+    limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+    headers={
+        "X-RapidAPI-Key": os.getenv("RAPID_API_KEY"),
+        "X-RapidAPI-Host": "du_mt_api.p.rapidapi.com"
+    }
+)
 
+# Repeated questions are translated and answered once, then written to every row that asks them
+questions_out = df[QUESTION_COLUMN].tolist()
+unique_questions = df[QUESTION_COLUMN].drop_duplicates().tolist()
+print(f"Processing {len(unique_questions)} unique questions ({len(df)} rows)...")
 
 # --- Save Results ---
-print(f"\nSaving results to {CSV_FILE_PATH}...")
-output_df = pd.DataFrame(results)
+# Rows stream into a temporary file as they complete; it replaces the input only once every row is written
+tmp_path = CSV_FILE_PATH + ".tmp"
+print(f"Writing results to {tmp_path} as they complete...")
+with open(tmp_path, 'w', newline='', encoding='utf-8') as out_file:
+    # Quote every field for CSV standard, matching the previous pandas output
+    writer = csv.writer(out_file, quoting=csv.QUOTE_ALL, lineterminator='\n')
+    writer.writerow(['Question', 'Answer'])
+    asyncio.run(main(unique_questions, questions_out, writer, out_file))
 
-# Ensure columns are correctly quoted for CSV standard and specify encoding
-output_df.to_csv(CSV_FILE_PATH, index=False, quoting=1, encoding='utf-8') # csv.QUOTE_ALL
+print(f"\nSaving results to {CSV_FILE_PATH}...")
+os.replace(tmp_path, CSV_FILE_PATH)
 
 print("Script finished successfully!")
@@ -0,0 +1,46 @@
+"""
+vllm_backend.py - Submit many prompts at once to a self-hosted vLLM server
+"""
+
+import os
+import asyncio
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Base URL of a vLLM OpenAI-compatible server, e.g. http://localhost:8000
+VLLM_URL = os.getenv("VLLM_URL")
+# Model name the server was started with
+VLLM_MODEL = os.getenv("VLLM_MODEL", "meta-llama/Meta-Llama-3-70B-Instruct")
+# Requests kept in flight at once; vLLM batches concurrent requests internally
+MAX_CONCURRENCY = int(os.getenv("VLLM_MAX_CONCURRENCY", "64"))
+
+async def abatch_chat(requests, model=VLLM_MODEL, temperature=0.7):
+    """Send every {custom_id: prompt} to the vLLM server concurrently and return {custom_id: content}."""
+    from openai import AsyncOpenAI
+
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    custom_ids = list(requests)
+
+    # One client, and so one connection pool, for the whole submission
+    async with AsyncOpenAI(base_url=f"{VLLM_URL}/v1", api_key="EMPTY") as client:
+        async def complete(prompt):
+            async with semaphore:
+                response = await client.chat.completions.create(
+                    model=model,
+                    temperature=temperature,
+                    messages=[{"role": "user", "content": prompt}]
+                )
+            return response.choices[0].message.content
+
+        responses = await asyncio.gather(*(complete(requests[custom_id]) for custom_id in custom_ids), return_exceptions=True)
+
+    return {
+        custom_id: f"Error: {str(response)}" if isinstance(response, Exception) else response
+        for custom_id, response in zip(custom_ids, responses)
+    }
+
+def batch_chat(requests, model=VLLM_MODEL, temperature=0.7):
+    """Synchronous wrapper around abatch_chat with the same signature as the Batch API submitters."""
+    return asyncio.run(abatch_chat(requests, model, temperature))